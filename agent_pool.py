@@ -0,0 +1,244 @@
+import threading
+import requests
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+
+from main import FiberyAgent, logger
+from resilience import RateLimiter
+
+
+class _Tenant:
+    def __init__(self, name: str, agent: FiberyAgent, weight: int, max_concurrency: int) -> None:
+        """
+        Initialize the scheduling state of one workspace.
+
+        Args:
+            name (str): The tenant name.
+            agent (FiberyAgent): The agent of the workspace.
+            weight (int): Share of the process concurrency relative to other tenants.
+            max_concurrency (int): Maximum number of jobs in flight for this tenant.
+        """
+        self.name = name
+        self.agent = agent
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        # Smooth weighted round-robin state
+        self.current_weight = 0
+
+        self.queue: Deque[Tuple[Future, Callable, tuple, dict]] = deque()
+        self.inflight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+
+class AgentPool:
+    def __init__(self, max_concurrency: int = 8) -> None:
+        """
+        Initialize a pool that schedules work of many Fibery workspaces fairly.
+
+        Queued work is dispatched by smooth weighted round-robin across tenants, limited by
+        each tenant's concurrency and by the total concurrency of the process. A tenant's rate
+        budget is taken by its agent before every HTTP request, however many a job sends.
+
+        Args:
+            max_concurrency (int): Maximum number of requests in flight across all tenants.
+        """
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive number.")
+
+        self.max_concurrency = max_concurrency
+        self._tenants: Dict[str, _Tenant] = {}
+        self._inflight = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="fibery-pool")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="fibery-pool-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def add_tenant(self, name: str, url: str, token: str, weight: int = 1, max_concurrency: int = 4,
+                   rate_per_second: Optional[float] = None, **agent_kwargs: Any) -> FiberyAgent:
+        """
+        Register a workspace with its own connection pool and rate budget.
+
+        Args:
+            name (str): The tenant name used in submit.
+            url (str): The URL of the workspace's Fibery API.
+            token (str): The authentication token for the workspace.
+            weight (int): Share of the process concurrency relative to other tenants.
+            max_concurrency (int): Maximum number of requests in flight for this tenant.
+            rate_per_second (Optional[float]): HTTP requests per second sent by the tenant's agent,
+                None for no limit.
+            **agent_kwargs: Further FiberyAgent options, e.g. cache or index.
+
+        Returns:
+            FiberyAgent: The agent created for the tenant.
+        """
+        if weight <= 0 or max_concurrency <= 0:
+            raise ValueError("weight and max_concurrency must be positive numbers.")
+        if rate_per_second is not None and rate_per_second <= 0:
+            raise ValueError("rate_per_second must be a positive number.")
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if rate_per_second is not None:
+            agent_kwargs["rate_limiter"] = RateLimiter(rate_per_second)
+        agent = FiberyAgent(url, token, session=session, **agent_kwargs)
+
+        with self._condition:
+            if name in self._tenants:
+                raise ValueError(f"Tenant '{name}' is already registered.")
+            self._tenants[name] = _Tenant(name, agent, weight, max_concurrency)
+
+        logger.debug(f"Tenant '{name}' added with weight {weight} and concurrency {max_concurrency}.")
+        return agent
+
+    def submit(self, tenant: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Queue work for a tenant.
+
+        Args:
+            tenant (str): The tenant name.
+            fn (Callable[..., Any]): Called as fn(agent, *args, **kwargs), e.g. FiberyAgent.get_data.
+            *args: Positional arguments passed after the agent.
+            **kwargs: Keyword arguments passed to fn.
+
+        Returns:
+            Future: Resolved with the result of fn.
+        """
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The agent pool is closed.")
+            if tenant not in self._tenants:
+                raise KeyError(f"Unknown tenant '{tenant}'.")
+            state = self._tenants[tenant]
+            state.queue.append((future, fn, args, kwargs))
+            state.submitted += 1
+            self._condition.notify_all()
+        return future
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return scheduling statistics.
+
+        Returns:
+            Dict[str, Any]: Total in-flight requests and per-tenant queue, in-flight and completion counts.
+        """
+        with self._condition:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "inflight": self._inflight,
+                "tenants": {
+                    name: {
+                        "weight": state.weight,
+                        "queued": len(state.queue),
+                        "inflight": state.inflight,
+                        "submitted": state.submitted,
+                        "completed": state.completed,
+                        "failed": state.failed,
+                    }
+                    for name, state in self._tenants.items()
+                },
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop the pool.
+
+        Args:
+            wait (bool): Finish queued work first; otherwise queued work is cancelled.
+        """
+        with self._condition:
+            self._closed = True
+            if not wait:
+                for state in self._tenants.values():
+                    while state.queue:
+                        state.queue.popleft()[0].cancel()
+            self._condition.notify_all()
+
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        for state in self._tenants.values():
+            if state.agent.session is not None:
+                state.agent.session.close()
+
+    def __enter__(self) -> "AgentPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _pick(self) -> Optional[_Tenant]:
+        """
+        Choose the next tenant to run; the caller must hold the lock.
+
+        Returns:
+            Optional[_Tenant]: The tenant, or None to wait for a notification.
+        """
+        if self._inflight >= self.max_concurrency:
+            return None
+
+        eligible = [
+            state for state in self._tenants.values()
+            if state.queue and state.inflight < state.max_concurrency
+        ]
+        if not eligible:
+            return None
+
+        total_weight = 0
+        chosen = None
+        for state in eligible:
+            state.current_weight += state.weight
+            total_weight += state.weight
+            if chosen is None or state.current_weight > chosen.current_weight:
+                chosen = state
+        chosen.current_weight -= total_weight
+        return chosen
+
+    def _dispatch(self) -> None:
+        """Hand queued work to the executor in fair order until the pool is closed and drained."""
+        with self._condition:
+            while True:
+                if self._closed and not any(state.queue for state in self._tenants.values()):
+                    return
+
+                state = self._pick()
+                if state is None:
+                    self._condition.wait()
+                    continue
+
+                future, fn, args, kwargs = state.queue.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                state.inflight += 1
+                self._inflight += 1
+                self._executor.submit(self._run, state, future, fn, args, kwargs)
+
+    def _run(self, state: _Tenant, future: Future, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        """Run one piece of work and release its concurrency slots."""
+        result = error = None
+        try:
+            result = fn(state.agent, *args, **kwargs)
+        except Exception as e:
+            error = e
+
+        with self._condition:
+            state.inflight -= 1
+            self._inflight -= 1
+            if error is not None:
+                state.failed += 1
+            else:
+                state.completed += 1
+            self._condition.notify_all()
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
@@ -48,3 +48,21 @@ FIBERY_FIELD_GENERAL =  [{
                         "fibery/secured?": False
                       }
                     }]
+
+# Fields whose values identify an entity when no key fields are configured for its database
+DEFAULT_KEY_FIELDS = ['NameSurname', 'Age']
+
+# Request timeouts in seconds per kind of operation sent to Fibery
+DEFAULT_TIMEOUTS = {
+    'schema': 30.0,
+    'read': 60.0,
+    'write': 60.0
+}
+
+# Relation kinds: (collection? on the database holding the field, collection? on the related database)
+RELATION_FIELD_TYPES = {
+    'many-to-one': (False, True),
+    'one-to-many': (True, False),
+    'one-to-one': (False, False),
+    'many-to-many': (True, True)
+}
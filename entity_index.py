@@ -0,0 +1,181 @@
+import json
+import uuid
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def natural_key(data: Dict[str, Any], key_fields: List[str]) -> str:
+    """
+    Build the natural key of an entity from its key fields.
+
+    Args:
+        data (Dict[str, Any]): Entity data keyed by field name.
+        key_fields (List[str]): Names of the fields that identify the entity.
+
+    Returns:
+        str: The key field values as a JSON list.
+
+    Raises:
+        KeyError: If a key field is missing from data.
+    """
+    return json.dumps([str(data[field]) for field in key_fields], ensure_ascii=False)
+
+
+def derive_entity_id(data: Dict[str, Any], key_fields: List[str]) -> str:
+    """
+    Derive a deterministic fibery/id from the key fields of an entity.
+
+    Args:
+        data (Dict[str, Any]): Entity data keyed by field name.
+        key_fields (List[str]): Names of the fields that identify the entity.
+
+    Returns:
+        str: A uuid5 of the concatenated key field values.
+
+    Raises:
+        KeyError: If a key field is missing from data.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, "".join(str(data[field]) for field in key_fields)))
+
+
+def content_hash(data: Dict[str, Any]) -> str:
+    """
+    Hash the content of an entity to detect changes without a remote query.
+
+    Args:
+        data (Dict[str, Any]): Entity data keyed by field name.
+
+    Returns:
+        str: SHA-1 hex digest of the data serialized with sorted keys.
+    """
+    serialized = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str, ensure_ascii=False)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+class EntityIndex:
+    def __init__(self, path: str = ":memory:") -> None:
+        """
+        Initialize a persistent index of natural keys to fibery/id and content hashes.
+
+        Args:
+            path (str): Path of the SQLite database file, ":memory:" for a process-local index.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entities ("
+                " database TEXT NOT NULL,"
+                " natural_key TEXT NOT NULL,"
+                " fibery_id TEXT NOT NULL,"
+                " content_hash TEXT,"
+                " PRIMARY KEY (database, natural_key))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                " database TEXT PRIMARY KEY,"
+                " last_modified TEXT NOT NULL)"
+            )
+
+    def lookup(self, database: str, key: str) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Find the fibery/id and content hash of an entity by its natural key.
+
+        Args:
+            database (str): The "app/database" name.
+            key (str): The natural key built by natural_key.
+
+        Returns:
+            Optional[Tuple[str, Optional[str]]]: (fibery_id, content_hash), or None if the key is unknown.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT fibery_id, content_hash FROM entities WHERE database = ? AND natural_key = ?",
+                (database, key)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def upsert(self, database: str, rows: Iterable[Tuple[str, str, Optional[str]]]) -> None:
+        """
+        Insert or replace index entries.
+
+        Args:
+            database (str): The "app/database" name.
+            rows (Iterable[Tuple[str, str, Optional[str]]]): (natural_key, fibery_id, content_hash) tuples.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO entities (database, natural_key, fibery_id, content_hash) "
+                "VALUES (?, ?, ?, ?)",
+                [(database, key, fibery_id, hash_value) for key, fibery_id, hash_value in rows]
+            )
+
+    def remove(self, database: str, keys: Iterable[str]) -> None:
+        """
+        Remove index entries by natural key.
+
+        Args:
+            database (str): The "app/database" name.
+            keys (Iterable[str]): Natural keys to remove.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM entities WHERE database = ? AND natural_key = ?",
+                [(database, key) for key in keys]
+            )
+
+    def drop_database(self, database: str) -> None:
+        """
+        Remove all entries and the sync state of a database.
+
+        Args:
+            database (str): The "app/database" name.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entities WHERE database = ?", (database,))
+            self._connection.execute("DELETE FROM sync_state WHERE database = ?", (database,))
+
+    def count(self, database: str) -> int:
+        """Return the number of indexed entities of a database."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM entities WHERE database = ?", (database,)
+            ).fetchone()[0]
+
+    def get_watermark(self, database: str) -> Optional[str]:
+        """
+        Return the latest fibery/modification-date seen by the last sync of a database.
+
+        Args:
+            database (str): The "app/database" name.
+
+        Returns:
+            Optional[str]: The ISO timestamp, or None if the database was never synced.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT last_modified FROM sync_state WHERE database = ?", (database,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, database: str, last_modified: str) -> None:
+        """
+        Store the latest fibery/modification-date seen by a sync of a database.
+
+        Args:
+            database (str): The "app/database" name.
+            last_modified (str): The ISO timestamp.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync_state (database, last_modified) VALUES (?, ?)",
+                (database, last_modified)
+            )
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._connection.close()
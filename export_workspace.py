@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import argparse
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Optional
+
+from main import FiberyAgent, FiberyError, logger
+from relations import primitive_fields
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet is optional, CSV is used without pyarrow
+    pa = None
+    pq = None
+
+def _arrow_type(field_type: str) -> Any:
+    """Map a Fibery field type (as returned by get_fields) to a pyarrow type."""
+    return {
+        'int': pa.int64(),
+        'decimal': pa.float64(),
+        'bool': pa.bool_(),
+        'date-time': pa.timestamp('ms', tz='UTC'),
+    }.get(field_type, pa.string())
+
+
+def to_typed_frame(records: list, fields: Dict[str, str]) -> pd.DataFrame:
+    """
+    Convert raw Fibery records into a DataFrame with typed columns.
+
+    Args:
+        records (list): Records returned by get_data, keyed by "Database/Field".
+        fields (Dict[str, str]): Field names mapped to their Fibery types.
+
+    Returns:
+        pd.DataFrame: Columns named after the fields, in the order of fields.
+    """
+    df_data = pd.DataFrame(records)
+    df_data.rename(columns={col: col.split('/')[-1] for col in df_data.columns}, inplace=True)
+    df_data = df_data.reindex(columns=list(fields.keys()))
+
+    for field_name, field_type in fields.items():
+        column = df_data[field_name]
+        if field_type == 'int':
+            df_data[field_name] = pd.to_numeric(column, errors='coerce').astype('Int64')
+        elif field_type == 'decimal':
+            df_data[field_name] = pd.to_numeric(column, errors='coerce').astype('float64')
+        elif field_type == 'bool':
+            df_data[field_name] = column.astype('boolean')
+        elif field_type == 'date-time':
+            df_data[field_name] = pd.to_datetime(column, utc=True, errors='coerce')
+        else:
+            df_data[field_name] = column.astype('string')
+
+    return df_data
+
+
+class _SnapshotWriter:
+    def __init__(self, path_base: str, fields: Dict[str, str], file_format: str) -> None:
+        """
+        Initialize an incremental writer for one database snapshot.
+
+        Args:
+            path_base (str): Output path without extension.
+            fields (Dict[str, str]): Field names mapped to their Fibery types.
+            file_format (str): "parquet" or "csv".
+        """
+        self.fields = fields
+        self.file_format = file_format
+        self.path = f"{path_base}.{file_format}"
+        self._parquet_writer = None
+        self._csv_header_written = False
+
+        if file_format == "parquet":
+            self._schema = pa.schema([(name, _arrow_type(field_type)) for name, field_type in fields.items()])
+
+    def write(self, df_page: pd.DataFrame) -> None:
+        """Append one page of typed records to the snapshot file."""
+        if self.file_format == "parquet":
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, self._schema)
+            table = pa.Table.from_pandas(df_page, schema=self._schema, preserve_index=False)
+            self._parquet_writer.write_table(table)
+        else:
+            df_page.to_csv(self.path, mode='a' if self._csv_header_written else 'w',
+                           header=not self._csv_header_written, index=False)
+            self._csv_header_written = True
+
+    def close(self) -> None:
+        """Finish the snapshot, creating an empty file for databases without records."""
+        if self.file_format == "parquet":
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, self._schema)
+            self._parquet_writer.close()
+        elif not self._csv_header_written:
+            self.write(to_typed_frame([], self.fields))
+
+
+def export_database(agent: FiberyAgent, app_name: str, database_name: str, fields: Dict[str, str],
+                    output_dir: str, file_format: str, page_size: int) -> Dict[str, Any]:
+    """
+    Stream one database into a snapshot file page by page.
+
+    Args:
+        agent (FiberyAgent): The agent used for the queries.
+        app_name (str): The name of the Fibery app.
+        database_name (str): The name of the database.
+        fields (Dict[str, str]): Field names mapped to their Fibery types.
+        output_dir (str): Directory for the snapshot files.
+        file_format (str): "parquet" or "csv".
+        page_size (int): Number of records requested per page.
+
+    Returns:
+        Dict[str, Any]: Manifest entry with the file, row and page counts and timing.
+    """
+    started = time.perf_counter()
+    writer = _SnapshotWriter(os.path.join(output_dir, database_name.replace('/', '_')), fields, file_format)
+    rows = 0
+    pages = 0
+
+    try:
+        for records in agent.iter_data(app_name, database_name, fields, page_size=page_size):
+            writer.write(to_typed_frame(records, fields))
+            rows += len(records)
+            pages += 1
+    finally:
+        writer.close()
+
+    seconds = round(time.perf_counter() - started, 3)
+    logger.success(f"Exported {rows} records from {database_name} to {writer.path} in {seconds}s.")
+    return {
+        "database": database_name,
+        "file": os.path.basename(writer.path),
+        "format": file_format,
+        "rows": rows,
+        "pages": pages,
+        "seconds": seconds,
+    }
+
+
+def export_app(agent: FiberyAgent, app_name: str, output_dir: str, max_workers: int = 4,
+               page_size: int = 500, file_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Export every database of an app into columnar snapshot files and write a manifest.
+
+    Databases are fetched concurrently in a thread pool, each one streamed page by page,
+    so a whole database is never held in memory.
+
+    Args:
+        agent (FiberyAgent): The agent used for the queries.
+        app_name (str): The name of the Fibery app.
+        output_dir (str): Directory for the snapshot files and manifest.json.
+        max_workers (int): Number of databases exported at the same time.
+        page_size (int): Number of records requested per page.
+        file_format (Optional[str]): "parquet" or "csv"; Parquet when pyarrow is installed by default.
+
+    Returns:
+        Dict[str, Any]: The manifest, also written to manifest.json.
+    """
+    if file_format is None:
+        file_format = "parquet" if pq is not None else "csv"
+    if file_format not in ("parquet", "csv"):
+        raise ValueError(f"File format '{file_format}' is not supported. Allowed formats: parquet, csv.")
+    if file_format == "parquet" and pq is None:
+        raise ValueError("Parquet export requires pyarrow to be installed.")
+
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    databases = agent.get_databases(app_name)
+    logger.info(f"# Exporting {len(databases)} databases of app {app_name} to {output_dir}")
+
+    entries = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            # Relation fields cannot be selected as plain columns, snapshots hold the primitive fields
+            executor.submit(export_database, agent, app_name, database_name, primitive_fields(fields),
+                            output_dir, file_format, page_size): database_name
+            for database_name, fields in databases.items()
+        }
+        for future in as_completed(futures):
+            database_name = futures[future]
+            try:
+                entries.append(future.result())
+            except Exception as e:
+                logger.error(f"Failed to export database '{database_name}': {e}")
+                entries.append({"database": database_name, "error": str(e)})
+
+    entries.sort(key=lambda entry: entry["database"])
+    manifest = {
+        "app": app_name,
+        "format": file_format,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "seconds": round(time.perf_counter() - started, 3),
+        "total_rows": sum(entry.get("rows", 0) for entry in entries),
+        "databases": entries,
+    }
+
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export all databases of a Fibery app to Parquet/CSV snapshots.")
+    parser.add_argument("app_name", help="Name of the Fibery app, e.g. TestSpace")
+    parser.add_argument("output_dir", help="Directory for the snapshot files and manifest.json")
+    parser.add_argument("--workers", type=int, default=4, help="Databases exported concurrently")
+    parser.add_argument("--page-size", type=int, default=500, help="Records requested per page")
+    parser.add_argument("--format", choices=["parquet", "csv"], default=None, help="Output file format")
+    args = parser.parse_args()
+
+    url: str = os.getenv('API_FIBERY_URL')
+    token: str = os.getenv('API_FIBERY_TOKEN')
+    if not url or not token:
+        logger.error("API_FIBERY_URL and API_FIBERY_TOKEN environment variables are required.")
+        sys.exit(1)
+
+    try:
+        result = export_app(FiberyAgent(url, token), args.app_name, args.output_dir,
+                            max_workers=args.workers, page_size=args.page_size, file_format=args.format)
+    except (FiberyError, ValueError) as e:
+        logger.error(f"Export failed: {e}")
+        sys.exit(1)
+
+    failed = [entry["database"] for entry in result["databases"] if "error" in entry]
+    if failed:
+        logger.error(f"Export finished with errors for: {', '.join(failed)}")
+        sys.exit(1)
+    logger.success(f"Exported {result['total_rows']} records in {result['seconds']}s.")
@@ -2,13 +2,20 @@ import os
 import sys
 import time
 import pandas as pd
-import uuid
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from logger_custom import LoggerCustom
 from dotenv import load_dotenv
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
-from constants import SUPPORTED_FIELD_TYPES, FIBERY_FIELD_GENERAL
+from constants import SUPPORTED_FIELD_TYPES, FIBERY_FIELD_GENERAL, DEFAULT_KEY_FIELDS, DEFAULT_TIMEOUTS
+from query_cache import QueryCache
+from entity_index import EntityIndex, natural_key, derive_entity_id, content_hash
+from validation import ValidationResult, validate_rows
+from traffic import TrafficRecorder
+from resilience import CircuitBreaker, RateLimiter
+from relations import build_select, flatten_records, is_relation, primitive_fields, related_databases, relation_commands
 
 # Set the logger
 log_file_path = 'log/main.log'
@@ -33,43 +40,309 @@ def time_countdown(seconds: int) -> None:
     logger.info('Time has passed!          ')                                                                 
 
 class FiberyAgent:
-    def __init__(self, url: str, token: str) -> None:
+    def __init__(self, url: str, token: str, cache: Optional[QueryCache] = None,
+                 index: Optional[EntityIndex] = None, key_fields: Optional[Dict[str, List[str]]] = None,
+                 recorder: Optional[TrafficRecorder] = None, session: Optional[requests.Session] = None,
+                 timeouts: Optional[Dict[str, float]] = None, hedge_after: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None, max_hedge_ratio: float = 0.1,
+                 rate_limiter: Optional[RateLimiter] = None) -> None:
         """
         Initialize FiberyAgent with API URL and token.
 
         Args:
             url (str): The URL of the Fibery API.
             token (str): The authentication token for the Fibery API.
+            cache (Optional[QueryCache]): Opt-in cache for get_data results, invalidated by writes.
+            index (Optional[EntityIndex]): Opt-in local index of natural keys to fibery/id.
+            key_fields (Optional[Dict[str, List[str]]]): Key fields per "app/database",
+                DEFAULT_KEY_FIELDS for databases not listed.
+            recorder (Optional[TrafficRecorder]): Opt-in recorder of every sent payload for later replay.
+            session (Optional[requests.Session]): Session with a connection pool to reuse, a new
+                connection per request if omitted.
+            timeouts (Optional[Dict[str, float]]): Request timeouts in seconds per operation
+                ("schema", "read", "write"), overriding DEFAULT_TIMEOUTS.
+            hedge_after (Optional[float]): Seconds after which a duplicate of a slow read is sent,
+                typically the observed p95 latency; None disables hedging.
+            breaker (Optional[CircuitBreaker]): Opt-in circuit breaker failing fast while the API is unhealthy.
+            max_hedge_ratio (float): Hedge budget, the share of reads in flight that may have a duplicate
+                in flight at the same time; a single hedge is always allowed.
+            rate_limiter (Optional[RateLimiter]): Opt-in budget taken before every HTTP request,
+                hedged duplicates included.
         """
+        if not 0 <= max_hedge_ratio <= 1:
+            raise ValueError("max_hedge_ratio must be between 0 and 1.")
+
         self.url = url
         self.token = token
+        self.cache = cache
+        self.index = index
+        self.key_fields = key_fields or {}
+        self.recorder = recorder
+        self.session = session
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.hedge_after = hedge_after
+        self.breaker = breaker
+        self.max_hedge_ratio = max_hedge_ratio
+        self.rate_limiter = rate_limiter
+        # Field types per "app/database", fetched once for validation
+        self._field_types: Dict[str, Dict[str, str]] = {}
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._counters = {"requests": 0, "timeouts": 0, "hedged": 0, "hedge_wins": 0, "hedges_skipped": 0,
+                          "breaker_rejections": 0}
+        self._in_flight = {"reads": 0, "hedges": 0}
+        self._counters_lock = threading.Lock()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return runtime statistics of the agent.
+
+        Returns:
+            Dict[str, Any]: Statistics grouped by component, e.g. "cache".
+        """
+        stats: Dict[str, Any] = {}
+        with self._counters_lock:
+            stats["requests"] = dict(self._counters)
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        if self.breaker is not None:
+            stats["breaker"] = self.breaker.stats()
+        if self.rate_limiter is not None:
+            stats["rate_limiter"] = self.rate_limiter.stats()
+        return stats
+
+    def _count(self, counter: str) -> None:
+        """Increment a request counter reported by get_stats."""
+        with self._counters_lock:
+            self._counters[counter] += 1
+
+    def _invalidate_cache(self, app_name: str, database_name: str, schema_changed: bool = False) -> None:
+        """Drop cached query results of a database after a write to it, and its field types on schema changes."""
+        if schema_changed:
+            self._field_types.pop(f"{app_name}/{database_name}", None)
+        if self.cache is not None:
+            removed = self.cache.invalidate(f"{app_name}/{database_name}")
+            if removed:
+                logger.debug(f"Invalidated {removed} cached queries for '{app_name}/{database_name}'.")
+
+    def get_key_fields(self, app_name: str, database_name: str) -> List[str]:
+        """Return the names of the fields that identify entities of a database."""
+        return self.key_fields.get(f"{app_name}/{database_name}", DEFAULT_KEY_FIELDS)
+
+    def _resolve_entity(self, app_name: str, database_name: str,
+                        data: Dict[str, Any]) -> Tuple[str, str, Optional[str]]:
+        """
+        Resolve the natural key and fibery/id of an entity, locally when it is indexed.
+
+        Args:
+            app_name (str): The name of the Fibery app.
+            database_name (str): The name of the Fibery database.
+            data (Dict[str, Any]): Entity data keyed by field name.
+
+        Returns:
+            Tuple[str, str, Optional[str]]: (natural_key, fibery_id, indexed content hash or None).
 
-    def send_data(self, data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Optional[requests.Response]:
+        Raises:
+            KeyError: If a key field is missing from data.
+        """
+        key_fields = self.get_key_fields(app_name, database_name)
+        key = natural_key(data, key_fields)
+        if self.index is not None:
+            indexed = self.index.lookup(f"{app_name}/{database_name}", key)
+            if indexed is not None:
+                return key, indexed[0], indexed[1]
+        return key, derive_entity_id(data, key_fields), None
+
+    @staticmethod
+    def _succeeded(response_json: Any, position: int) -> bool:
+        """Check the result of one command in a batch response, a non-list response counts as success."""
+        if isinstance(response_json, list) and position < len(response_json):
+            result = response_json[position]
+            return not isinstance(result, dict) or result.get("success", True)
+        return True
+
+    def send_data(self, data: Union[Dict[str, Any], List[Dict[str, Any]]],
+                  operation: str = "write") -> Optional[requests.Response]:
         """
         Send a request to the Fibery API.
 
         Args:
             data (Union[Dict[str, Any], List[Dict[str, Any]]]): The data to be sent in the request.
+            operation (str): "schema", "read" or "write"; selects the timeout, and reads may be hedged.
 
         Returns:
             Optional(requests.Response)/None: The response object containing the schema data, or None if an error occurs.
         """
-        headers = {
-            "Authorization": f"Token {self.token}",
-            "Content-Type": "application/json",
-        }
+        if self.breaker is not None and not self.breaker.allow():
+            self._count("breaker_rejections")
+            error_msg = "Failed to send data to Fibery: circuit breaker is open"
+            logger.error(error_msg)
+            raise FiberyError(error_msg)
+
+        timeout = self.timeouts.get(operation)
+        self._count("requests")
         try:
-            response = requests.post(self.url, headers=headers, json=data)
+            if self.hedge_after is not None and operation in ("schema", "read"):
+                response = self._post_hedged(data, timeout)
+            else:
+                response = self._post(data, timeout)
             if response is None:
                 logger.error("Received None response from Fibery API")
                 raise FiberyError("Failed to send data to Fibery: No response")
             
             response.raise_for_status()  # Raise exception for HTTP errors
-            return response
-        except requests.RequestException as e:
+        except (requests.RequestException, FiberyError) as e:
+            if isinstance(e, requests.Timeout):
+                self._count("timeouts")
+            if self.breaker is not None:
+                # Client errors mean the API is healthy, only failures of the service count
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                if isinstance(e, requests.HTTPError) and status is not None and status < 500:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+            if isinstance(e, FiberyError):
+                raise
             logger.error(f"Request error: {e}")
             raise FiberyError(f"Failed to send data to Fibery: {e}")
-       
+        except Exception:
+            # Errors outside the HTTP exchange say nothing about the API, but the probe must not stay taken
+            if self.breaker is not None:
+                self.breaker.release()
+            raise
+
+        if self.breaker is not None:
+            self.breaker.record_success()
+        return response
+
+    def _post(self, data: Union[Dict[str, Any], List[Dict[str, Any]]],
+              timeout: Optional[float]) -> Optional[requests.Response]:
+        """
+        Post a payload once, after taking the rate budget, recording it when the agent has a recorder.
+
+        Args:
+            data (Union[Dict[str, Any], List[Dict[str, Any]]]): The data to be sent in the request.
+            timeout (Optional[float]): Request timeout in seconds.
+
+        Returns:
+            Optional[requests.Response]: The raw response, HTTP errors are not raised here.
+        """
+        headers = {
+            "Authorization": f"Token {self.token}",
+            "Content-Type": "application/json",
+        }
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        started_at = time.time()
+        started = time.perf_counter()
+        response = None
+        error = None
+        try:
+            post = self.session.post if self.session is not None else requests.post
+            response = post(self.url, headers=headers, json=data, timeout=timeout)
+            if response is None:
+                error = "NoResponse"
+            return response
+        except requests.RequestException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if self.recorder is not None:
+                content = getattr(response, "content", None)
+                self.recorder.record(
+                    data, started_at, time.perf_counter() - started,
+                    getattr(response, "status_code", None),
+                    len(content) if isinstance(content, (bytes, str)) else 0,
+                    error
+                )
+
+    def _post_hedged(self, data: Union[Dict[str, Any], List[Dict[str, Any]]],
+                     timeout: Optional[float]) -> Optional[requests.Response]:
+        """
+        Post an idempotent payload, sending a duplicate if the first attempt is slower than hedge_after.
+
+        The first attempt is sent at once on its own thread, never queued; only the duplicate is
+        handed to the hedge executor, and only while the hedge budget allows it. The first answer
+        without an exception or a 5xx status wins.
+
+        Args:
+            data (Union[Dict[str, Any], List[Dict[str, Any]]]): The data to be sent in the request.
+            timeout (Optional[float]): Request timeout in seconds.
+
+        Returns:
+            Optional[requests.Response]: The first successful answer, or the first attempt's failure.
+        """
+        # (is_hedge, response, error) of every answered attempt, in order of arrival
+        outcomes: List[Tuple[bool, Optional[requests.Response], Optional[Exception]]] = []
+        answered = threading.Condition()
+
+        def attempt(is_hedge: bool) -> None:
+            response = error = None
+            try:
+                response = self._post(data, timeout)
+            except Exception as e:
+                error = e
+            finally:
+                if is_hedge:
+                    with self._counters_lock:
+                        self._in_flight["hedges"] -= 1
+            with answered:
+                outcomes.append((is_hedge, response, error))
+                answered.notify_all()
+
+        def succeeded() -> Optional[Tuple[bool, Optional[requests.Response], Optional[Exception]]]:
+            return next((outcome for outcome in outcomes
+                         if outcome[2] is None and not self._attempt_failed(outcome[1])), None)
+
+        with self._counters_lock:
+            self._in_flight["reads"] += 1
+        try:
+            threading.Thread(target=attempt, args=(False,), name="fibery-read", daemon=True).start()
+            attempts = 1
+            with answered:
+                answered.wait_for(lambda: outcomes, timeout=self.hedge_after)
+                if not outcomes and self._reserve_hedge():
+                    self._count("hedged")
+                    logger.debug(f"No response after {self.hedge_after}s, sending a hedged request.")
+                    self._get_hedge_executor().submit(attempt, True)
+                    attempts = 2
+                answered.wait_for(lambda: succeeded() is not None or len(outcomes) == attempts)
+                winner = succeeded()
+        finally:
+            with self._counters_lock:
+                self._in_flight["reads"] -= 1
+
+        if winner is not None:
+            if winner[0]:
+                self._count("hedge_wins")
+            return winner[1]
+        # Every attempt failed, the first one is reported
+        _, response, error = next(outcome for outcome in outcomes if not outcome[0])
+        if error is not None:
+            raise error
+        return response
+
+    @staticmethod
+    def _attempt_failed(response: Optional[requests.Response]) -> bool:
+        """Check whether a hedged attempt got no usable answer, a 5xx status counts as a failure."""
+        return response is None or response.status_code >= 500
+
+    def _reserve_hedge(self) -> bool:
+        """Take a slot of the hedge budget, at least one hedge and max_hedge_ratio of the reads in flight."""
+        with self._counters_lock:
+            budget = max(1.0, self.max_hedge_ratio * self._in_flight["reads"])
+            if self._in_flight["hedges"] >= budget:
+                self._counters["hedges_skipped"] += 1
+                return False
+            self._in_flight["hedges"] += 1
+            return True
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        """Create the executor for hedged duplicates on first use."""
+        with self._counters_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="fibery-hedge")
+            return self._hedge_executor
+
     def get_schema(self) -> Optional[requests.Response]:
         """
         Retrieve the schema from Fibery.
@@ -78,7 +351,7 @@ class FiberyAgent:
             Response: The response object containing the schema data, or None if an error occurs.
         """
         data = [{"command": "fibery.schema/query"}]
-        data_schema = self.send_data(data)
+        data_schema = self.send_data(data, operation="schema")
 
         if data_schema.status_code != 200:
             error_msg = f"[Fibery Error] Failed to get schema: {data_schema.text if data_schema else 'No response'}"
@@ -87,14 +360,18 @@ class FiberyAgent:
 
         return data_schema
     
-    def create_database(self, app_name: str, database_name: str, fields: Dict[str, str]) -> bool:
+    def create_database(self, app_name: str, database_name: str, fields: Dict[str, Union[str, Dict[str, str]]]) -> bool:
             """
             Create a database in Fibery.
             
+            A relation field is given as {"type": "many-to-one", "to": "Departments", "back": "Employees"};
+            the related database must exist, and "back" names the field created on it.
+
             Args:
                 app_name (str): The name of the Fibery app.
                 database_name (str): The name of the database.
-                fields (Dict[str, str]): A dictionary with field names as keys and field types as values.
+                fields (Dict[str, Union[str, Dict[str, str]]]): A dictionary with field names as keys and
+                    field types (SUPPORTED_FIELD_TYPES) or relation specifications as values.
 
             Returns:
                 bool: True if the database was successfully created, False otherwise.
@@ -103,9 +380,19 @@ class FiberyAgent:
             
             # List to store information about fields
             fibery_fields: List[Dict[str, Union[str, Dict[str, bool]]]] = []
+            # Relation fields are created on both databases after the type itself
+            field_commands: List[Dict[str, Any]] = []
+            related_names: List[str] = []
 
             # Processing each custom field
             for count, (field_name, field_type) in enumerate(fields.items()):
+                if is_relation(field_type):
+                    if count == 0:
+                        raise ValueError(f"The first field '{field_name}' is the title and cannot be a relation.")
+                    field_commands.extend(relation_commands(app_name, database_name, field_name, field_type))
+                    related_names.append(field_type['to'])
+                    continue
+
                 # Checking support for the specified field type
                 if field_type not in SUPPORTED_FIELD_TYPES:
                     raise ValueError(f"Field type '{field_type}' is not supported. "
@@ -145,12 +432,16 @@ class FiberyAgent:
                                     "fibery/fields": fibery_fields
                                 }
                             }
-                        ]
+                        ] + field_commands
                     }
                 }
             ]
 
-            response = self.send_data(general_data)
+            try:
+                response = self.send_data(general_data)
+            finally:
+                for name in [database_name] + related_names:
+                    self._invalidate_cache(app_name, name, schema_changed=True)
 
             if not response or response.status_code != 200:
                 logger.error(f"[Fibery Error] Failed to create database: {response.text if response else 'No response'}")
@@ -165,7 +456,9 @@ class FiberyAgent:
                     error_message = response_json[0].get("result", {}).get("message", "Unknown error")
                     if 'database already exists' in error_message:
                         logger.warning(f"Database '{database_name}' already exists: {error_message}")
-                        return True
+                        # The relations were rejected together with the type, they are created on their own
+                        return self._create_relation_fields(app_name, database_name, field_commands) \
+                            if field_commands else True
                     else:
                         logger.error(f"Database '{database_name}' could not be created in app '{app_name}'. "
                                     f"Ensure the app '{app_name}' exists. Error: {error_message}")
@@ -177,6 +470,38 @@ class FiberyAgent:
             logger.error("Unexpected response format or empty response.")
             return False
     
+    def _create_relation_fields(self, app_name: str, database_name: str,
+                                field_commands: List[Dict[str, Any]]) -> bool:
+        """
+        Create the relation fields of an existing database.
+
+        Args:
+            app_name (str): The name of the Fibery app.
+            database_name (str): The name of the database holding the relations.
+            field_commands (List[Dict[str, Any]]): The "schema.field/create" commands from relation_commands.
+
+        Returns:
+            bool: True if the fields were created or already exist, False otherwise.
+        """
+        response = self.send_data([{"command": "fibery.schema/batch", "args": {"commands": field_commands}}])
+        if not response or response.status_code != 200:
+            logger.error(f"[Fibery Error] Failed to create relations: {response.text if response else 'No response'}")
+            return False
+
+        response_json = response.json()
+        result = response_json[0] if isinstance(response_json, list) and response_json else {}
+        if result.get("success", None):
+            logger.success(f"Relations of database '{database_name}' were created in app '{app_name}'.")
+            return True
+
+        error_message = result.get("result", {}).get("message", "Unknown error")
+        if 'already exists' in error_message:
+            logger.warning(f"Relations of database '{database_name}' already exist: {error_message}")
+            return True
+        logger.error(f"Relations of database '{database_name}' could not be created in app '{app_name}'. "
+                     f"Error: {error_message}")
+        return False
+
     def get_fields(self, app_name: str, database_name: str) -> Dict[str, str]:
         """
         Retrieve field names and types for a given database in Fibery.
@@ -189,7 +514,7 @@ class FiberyAgent:
             Dict: A dictionary with field names as keys and field types as values.
         """
         data = [{"command": "fibery.schema/query", "database": f"{app_name}/{database_name}"}]
-        response = self.send_data(data)
+        response = self.send_data(data, operation="schema")
 
         if not response or response.status_code != 200:
             logger.error(f"Failed to get fields: {response.text if response else 'No response'}")
@@ -199,29 +524,78 @@ class FiberyAgent:
             response_json = response.json()
             entity_types = response_json[0].get("result", {}).get("fibery/types", [])
 
-            data_fields = {}
             for entity_type in entity_types:
-                fibery_name = entity_type.get('fibery/name', '')
-                if fibery_name == f"{app_name}/{database_name}":
-                    raw_fields = entity_type.get('fibery/fields', [])
-                    filtered_fields = [
-                        field for field in raw_fields
-                        if field.get('fibery/name', '').startswith(f"{app_name}/") or
-                        field.get('fibery/name', '').startswith(f"{database_name}/")
-                    ]
+                if entity_type.get('fibery/name', '') == f"{app_name}/{database_name}":
+                    return self._parse_fields(app_name, database_name, entity_type)
 
-                    for field in filtered_fields:
-                        field_name = field.get('fibery/name', '').split('/')[-1].strip()
-                        field_type = field.get('fibery/type', '').split('/')[-1].strip()
-                        if field_name and field_type:
-                            data_fields[field_name] = field_type
-
-            return data_fields
+            return {}
 
         except Exception as e:
             logger.error(f"Error processing Fibery response: {e}")
             return {}
 
+    @staticmethod
+    def _parse_fields(app_name: str, database_name: str, entity_type: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Extract user field names and types from a schema entry of a database.
+
+        Args:
+            app_name (str): The name of the Fibery app.
+            database_name (str): The name of the database.
+            entity_type (Dict[str, Any]): The "fibery/types" entry of the database.
+
+        Returns:
+            Dict: A dictionary with field names as keys and field types as values.
+        """
+        data_fields = {}
+        raw_fields = entity_type.get('fibery/fields', [])
+        filtered_fields = [
+            field for field in raw_fields
+            if field.get('fibery/name', '').startswith(f"{app_name}/") or
+            field.get('fibery/name', '').startswith(f"{database_name}/")
+        ]
+
+        for field in filtered_fields:
+            field_name = field.get('fibery/name', '').split('/')[-1].strip()
+            field_type = field.get('fibery/type', '').split('/')[-1].strip()
+            if field_name and field_type:
+                data_fields[field_name] = field_type
+
+        return data_fields
+
+    def get_databases(self, app_name: str) -> Dict[str, Dict[str, str]]:
+        """
+        Discover all databases of an app and their fields with a single schema query.
+
+        Args:
+            app_name (str): The name of the Fibery app.
+
+        Returns:
+            Dict[str, Dict[str, str]]: Database names mapped to their fields (name -> type).
+        """
+        response = self.get_schema()
+
+        try:
+            entity_types = response.json()[0].get("result", {}).get("fibery/types", [])
+        except Exception as e:
+            error_msg = f"Error processing Fibery schema: {e}"
+            logger.error(error_msg)
+            raise FiberyError(error_msg)
+
+        databases = {}
+        for entity_type in entity_types:
+            fibery_name = entity_type.get('fibery/name', '')
+            if not fibery_name.startswith(f"{app_name}/"):
+                continue
+            # Enum and other auxiliary types are not user databases
+            if not entity_type.get('fibery/meta', {}).get('fibery/domain?', False):
+                continue
+            database_name = fibery_name[len(app_name) + 1:]
+            databases[database_name] = self._parse_fields(app_name, database_name, entity_type)
+
+        logger.debug(f"Discovered {len(databases)} databases in app '{app_name}'.")
+        return databases
+
     def delete_database(self, app_name: str, database_name: str) -> bool:
         """
         Delete a database in Fibery.
@@ -254,13 +628,18 @@ class FiberyAgent:
         ]
 
         try:
-            response: Optional[requests.Response] = self.send_data(delete_payload)
+            try:
+                response: Optional[requests.Response] = self.send_data(delete_payload)
+            finally:
+                self._invalidate_cache(app_name, database_name, schema_changed=True)
 
             if response is None:
                 logger.error(f"Failed to send delete request for '{entity_type}', response is None.")
                 return False
 
             if response.status_code == 200:
+                if self.index is not None:
+                    self.index.drop_database(entity_type)
                 logger.success(f"Database '{database_name}' in app '{app_name}' was successfully deleted.")
                 return True
             else:
@@ -271,13 +650,46 @@ class FiberyAgent:
             logger.error(f"Exception while deleting database '{database_name}': {e}")
             return False
 
-    def add_entity(self, app_name: str, database_name: str, list_data: List[Dict[str, any]]) -> Optional[dict]:
+    def validate_entities(self, app_name: str, database_name: str, list_data: List[Dict[str, any]]) -> ValidationResult:
+        """
+        Validate entity rows locally against the field types of a database and coerce safe values.
+
+        Args:
+            app_name (str): The name of the Fibery app.
+            database_name (str): The name of the Fibery database.
+            list_data (List[Dict[str, any]]): A list of dictionaries containing entity data.
+
+        Returns:
+            ValidationResult: Coerced valid rows and invalid rows with their reasons.
+        """
+        database = f"{app_name}/{database_name}"
+        fields = self._field_types.get(database)
+        if fields is None:
+            fields = self.get_fields(app_name, database_name)
+            if not fields:
+                error_msg = f"No fields found for database '{database}', cannot validate entities."
+                logger.error(error_msg)
+                raise FiberyError(error_msg)
+            self._field_types[database] = fields
+
+        return validate_rows(list_data, fields)
+
+    def _drop_invalid(self, app_name: str, database_name: str, list_data: List[Dict[str, any]]) -> List[Dict[str, any]]:
+        """Validate rows before sending, logging and skipping the invalid ones."""
+        result = self.validate_entities(app_name, database_name, list_data)
+        for invalid in result.invalid_rows:
+            logger.error(f"Invalid entity {invalid['row']}: {'; '.join(invalid['errors'])}. Skipping entity.")
+        return result.valid_rows
+
+    def add_entity(self, app_name: str, database_name: str, list_data: List[Dict[str, any]],
+                   validate: bool = False) -> Optional[dict]:
         """Add multiple entities to a Fibery database.
 
         Args:
             app_name (str): The name of the Fibery app.
             database_name (str): The name of the Fibery database.
             list_data (List[Dict[str, any]]): A list of dictionaries containing entity data.
+            validate (bool): Validate and coerce the rows locally first, skipping invalid ones.
 
         Returns:
             Optional[dict]: Response JSON if successful, otherwise None.
@@ -287,11 +699,15 @@ class FiberyAgent:
             logger.error(error_msg)
             raise FiberyError(error_msg)
 
+        if validate:
+            list_data = self._drop_invalid(app_name, database_name, list_data)
+
         commands = []
+        index_rows = []
 
         for data in list_data:
             try:
-                unique_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{data['NameSurname']}{data['Age']}"))
+                key, unique_id, _ = self._resolve_entity(app_name, database_name, data)
             except KeyError as e:
                 logger.error(f"Missing required key: {e}. Skipping entity creation.")
                 continue  # Skip this entry if essential fields are missing
@@ -306,10 +722,11 @@ class FiberyAgent:
                 }
             }
 
-            for key, value in data.items():
-                entity_data["args"]["entity"][f"{database_name}/{key}"] = value
+            for field_name, value in data.items():
+                entity_data["args"]["entity"][f"{database_name}/{field_name}"] = value
 
             commands.append(entity_data)
+            index_rows.append((key, unique_id, content_hash(data)))
 
         if not commands:
             error_msg = f"No valid entities to add."
@@ -317,15 +734,25 @@ class FiberyAgent:
             raise FiberyError(error_msg)
 
         try:
-            response = self.send_data(commands)
+            try:
+                response = self.send_data(commands)
+            finally:
+                self._invalidate_cache(app_name, database_name)
 
             if response is None or response.status_code != 200:
                 error_msg = f"Failed to process entity addition: {response.text if response else 'No response received'}"
                 logger.error(error_msg)
                 raise FiberyError(error_msg)
 
+            response_json = response.json()
+
+            if self.index is not None:
+                self.index.upsert(f"{app_name}/{database_name}", [
+                    row for position, row in enumerate(index_rows) if self._succeeded(response_json, position)
+                ])
+
             logger.success(f"Data successfully added to the database '{database_name}' in app '{app_name}'.")
-            return response.json()
+            return response_json
 
         except Exception as e:
             error_msg = f"Unexpected error while adding entities: {e}"
@@ -350,10 +777,12 @@ class FiberyAgent:
             raise FiberyError(error_msg)
 
         commands = []
+        sent_data = []
+        sent_keys = []
 
         for data in list_data:
             try:
-                unique_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{data['NameSurname']}{data['Age']}"))
+                key, unique_id, _ = self._resolve_entity(app_name, database_name, data)
             except KeyError as e:
                 logger.error(f"Missing required key: {e}. Skipping entity deletion.")
                 continue  # Skip this entry if essential fields are missing
@@ -369,6 +798,8 @@ class FiberyAgent:
             }
 
             commands.append(entity_data)
+            sent_data.append(data)
+            sent_keys.append(key)
 
         if not commands:
             error_msg = f"No valid entities to delete."
@@ -376,7 +807,10 @@ class FiberyAgent:
             raise FiberyError(error_msg)
 
         try:
-            response = self.send_data(commands)
+            try:
+                response = self.send_data(commands)
+            finally:
+                self._invalidate_cache(app_name, database_name)
 
             if response is None or response.status_code != 200:
                 error_msg = f"Failed to delete entities: {response.text if response else 'No response received'}"
@@ -386,28 +820,216 @@ class FiberyAgent:
             response_json = response.json()
             logger.success("Entities processed for deletion.")
 
-            for index, result in enumerate(response_json):
-                entity_info = list_data[index]
+            deleted_keys = []
+            for position, result in enumerate(response_json):
+                entity_info = sent_data[position]
                 if result.get("success", False):
                     logger.success(f"Successfully deleted: {entity_info}")
+                    deleted_keys.append(sent_keys[position])
                 else:
                     error_message = result.get("result", {}).get("name", "Unknown error")
                     logger.error(f"Failed to delete: {entity_info}. Error: {error_message}")
 
+            if self.index is not None:
+                self.index.remove(f"{app_name}/{database_name}", deleted_keys)
+
             return response_json
 
         except Exception as e:
             logger.error(f"Unexpected error during entity deletion: {e}")
             raise
 
-    def get_data(self, app_name: str, database_name: str, dict_fields: Dict[str, str]) -> Optional[List[Dict[str, any]]]:
+    def upsert_entities(self, app_name: str, database_name: str, list_data: List[Dict[str, any]],
+                        validate: bool = False) -> Optional[list]:
+        """
+        Create or update multiple entities in a Fibery database.
+
+        With an index, entities are matched by their natural key locally: unchanged entities are skipped,
+        indexed ones are updated and unknown ones are created. Without an index every entity is updated
+        by its derived fibery/id.
+
+        Args:
+            app_name (str): The name of the Fibery app.
+            database_name (str): The name of the Fibery database.
+            list_data (List[Dict[str, any]]): A list of dictionaries containing entity data.
+            validate (bool): Validate and coerce the rows locally first, skipping invalid ones.
+
+        Returns:
+            Optional[list]: Response JSON if any command was sent, None if all entities were unchanged.
+        """
+        if not list_data:
+            error_msg = f"No data provided for entity update."
+            logger.error(error_msg)
+            raise FiberyError(error_msg)
+
+        if validate:
+            list_data = self._drop_invalid(app_name, database_name, list_data)
+
+        commands = []
+        index_rows = []
+        unchanged = 0
+
+        for data in list_data:
+            try:
+                key, unique_id, indexed_hash = self._resolve_entity(app_name, database_name, data)
+            except KeyError as e:
+                logger.error(f"Missing required key: {e}. Skipping entity update.")
+                continue  # Skip this entry if essential fields are missing
+
+            data_hash = content_hash(data)
+            if indexed_hash == data_hash:
+                unchanged += 1
+                continue
+
+            is_known = self.index is None or indexed_hash is not None
+            entity_data = {
+                "command": "fibery.entity/update" if is_known else "fibery.entity/create",
+                "args": {
+                    "type": f"{app_name}/{database_name}",
+                    "entity": {
+                        "fibery/id": unique_id
+                    }
+                }
+            }
+
+            for field_name, value in data.items():
+                entity_data["args"]["entity"][f"{database_name}/{field_name}"] = value
+
+            commands.append(entity_data)
+            index_rows.append((key, unique_id, data_hash))
+
+        if unchanged:
+            logger.info(f"Skipped {unchanged} unchanged entities in '{database_name}'.")
+
+        if not commands:
+            if unchanged:
+                return None
+            error_msg = f"No valid entities to update."
+            logger.warning(error_msg)
+            raise FiberyError(error_msg)
+
+        try:
+            try:
+                response = self.send_data(commands)
+            finally:
+                self._invalidate_cache(app_name, database_name)
+
+            if response is None or response.status_code != 200:
+                error_msg = f"Failed to process entity update: {response.text if response else 'No response received'}"
+                logger.error(error_msg)
+                raise FiberyError(error_msg)
+
+            response_json = response.json()
+
+            if self.index is not None:
+                self.index.upsert(f"{app_name}/{database_name}", [
+                    row for position, row in enumerate(index_rows) if self._succeeded(response_json, position)
+                ])
+
+            logger.success(f"Data successfully updated in the database '{database_name}' in app '{app_name}'.")
+            return response_json
+
+        except Exception as e:
+            error_msg = f"Unexpected error while updating entities: {e}"
+            logger.error(error_msg)
+            raise FiberyError(error_msg)
+
+    def sync_index(self, app_name: str, database_name: str, full: bool = False) -> int:
+        """
+        Refresh the local index of a database with entities modified since the last sync.
+
+        A delta sync does not see entities deleted outside this agent; use full=True to rebuild the index.
+
+        Args:
+            app_name (str): The name of the Fibery app.
+            database_name (str): The name of the Fibery database.
+            full (bool): Drop the indexed entries and fetch every entity.
+
+        Returns:
+            int: The number of entities written to the index.
+        """
+        if self.index is None:
+            raise FiberyError("The agent has no entity index to sync.")
+
+        database = f"{app_name}/{database_name}"
+        if full:
+            self.index.drop_database(database)
+
+        fields = primitive_fields(self.get_fields(app_name, database_name))
+        if not fields:
+            error_msg = f"No fields found for database '{database}'."
+            logger.error(error_msg)
+            raise FiberyError(error_msg)
+
+        query = {
+            "q/from": database,
+            "q/select": ["fibery/id", "fibery/modification-date"] + [f"{database_name}/{field}" for field in fields],
+            "q/order-by": [[["fibery/modification-date"], "q/asc"]],
+            "q/limit": "q/no-limit"
+        }
+        watermark = self.index.get_watermark(database)
+        if watermark is not None:
+            query["q/where"] = [">", ["fibery/modification-date"], "$since"]
+        query_payload = [
+            {
+                "command": "fibery.entity/query",
+                "args": {
+                    "query": query,
+                    "params": {"$since": watermark} if watermark is not None else {}
+                }
+            }
+        ]
+
+        response = self.send_data(query_payload, operation="read")
+        if response is None or response.status_code != 200:
+            error_msg = f"Failed to sync index: {response.text if response else 'No response received'}"
+            logger.error(error_msg)
+            raise FiberyError(error_msg)
+
+        records = response.json()[0].get("result", []) or []
+        key_fields = self.get_key_fields(app_name, database_name)
+        index_rows = []
+
+        for record in records:
+            data = {
+                name.split('/')[-1]: value for name, value in record.items()
+                if name.startswith(f"{database_name}/")
+            }
+            try:
+                key = natural_key(data, key_fields)
+            except KeyError as e:
+                logger.warning(f"Entity {record.get('fibery/id')} has no key field {e}. Not indexed.")
+                continue
+            index_rows.append((key, record["fibery/id"], content_hash(data)))
+            modified = record.get("fibery/modification-date")
+            if modified and (watermark is None or modified > watermark):
+                watermark = modified
+
+        self.index.upsert(database, index_rows)
+        if watermark is not None:
+            self.index.set_watermark(database, watermark)
+
+        logger.success(f"Synced {len(index_rows)} entities of '{database}' into the index.")
+        return len(index_rows)
+
+    def get_data(self, app_name: str, database_name: str, dict_fields: Dict[str, str],
+                 limit: Optional[int] = None, offset: int = 0,
+                 relations: Optional[Dict[str, Dict[str, Any]]] = None) -> Optional[List[Dict[str, any]]]:
         """
         Retrieve data from a Fibery database.
 
+        When the agent has a cache, results are served from it for repeated queries.
+
         Args:
             app_name (str): The name of the Fibery app.
             database_name (str): The name of the Fibery database.
             dict_fields (Dict[str, str]): A dictionary of field names to retrieve.
+            limit (Optional[int]): Maximum number of records to return, None for no limit.
+            offset (int): Number of records to skip, used together with limit for paging.
+            relations (Optional[Dict[str, Dict[str, Any]]]): Relation fields to select with the records, e.g.
+                {"Department": {"database": "Departments", "fields": ["Name"]},
+                 "Projects": {"database": "Projects", "fields": ["Title"], "collection": True, "limit": 10}};
+                see relations.build_select.
 
         Returns:
             Optional[List[Dict[str, any]]]: Retrieved data as a list of dictionaries or None if an error occurs.
@@ -417,23 +1039,42 @@ class FiberyAgent:
             logger.warning(error_msg)
             raise FiberyError(error_msg)
 
-        data_fields = [f"{database_name}/{field}" for field in dict_fields.keys()]
+        if relations:
+            data_fields = build_select(database_name, list(dict_fields.keys()), relations)
+        else:
+            data_fields = [f"{database_name}/{field}" for field in dict_fields.keys()]
+
+        query = {
+            "q/from": f"{app_name}/{database_name}",
+            "q/select": data_fields,
+            "q/limit": "q/no-limit" if limit is None else limit
+        }
+        if limit is not None:
+            # A stable order keeps pages from overlapping or skipping records
+            query["q/offset"] = offset
+            query["q/order-by"] = [[["fibery/creation-date"], "q/asc"], [["fibery/id"], "q/asc"]]
 
         query_payload = [
             {
                 "command": "fibery.entity/query",
                 "args": {
-                    "query": {
-                        "q/from": f"{app_name}/{database_name}",
-                        "q/select": data_fields,
-                        "q/limit": "q/no-limit"
-                    }
+                    "query": query
                 }
             }
         ]
 
+        cache_key = QueryCache.make_key(query_payload) if self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Served query on {database_name} from cache.")
+                return cached
+            cache_databases = [f"{app_name}/{name}" for name in related_databases(relations)]
+            # Read before sending: a write finishing while the query is in flight makes the result stale
+            cache_generation = self.cache.generation([f"{app_name}/{database_name}"] + cache_databases)
+
         try:
-            response = self.send_data(query_payload)
+            response = self.send_data(query_payload, operation="read")
 
             if response is None or response.status_code != 200:
                 error_msg = f"Failed to retrieve data: {response.text if response else 'No response received'}"
@@ -448,6 +1089,13 @@ class FiberyAgent:
                 raise FiberyError(error_msg)
         
             logger.success(f"Successfully retrieved {len(response_json[0].get('result', []))} records from {database_name}.")
+
+            if cache_key is not None:
+                content = getattr(response, "content", None)
+                size = len(content) if isinstance(content, (bytes, str)) else None
+                self.cache.put(cache_key, f"{app_name}/{database_name}", response_json, size,
+                               related=cache_databases, generation=cache_generation)
+
             return response_json
             
 
@@ -455,6 +1103,62 @@ class FiberyAgent:
             logger.error(f"Unexpected error during data retrieval: {e}")
             raise  
 
+    def iter_data(self, app_name: str, database_name: str, dict_fields: Dict[str, str],
+                  page_size: int = 500,
+                  relations: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[List[Dict[str, any]]]:
+        """
+        Retrieve data from a Fibery database page by page.
+
+        Args:
+            app_name (str): The name of the Fibery app.
+            database_name (str): The name of the Fibery database.
+            dict_fields (Dict[str, str]): A dictionary of field names to retrieve.
+            page_size (int): Number of records requested per page.
+            relations (Optional[Dict[str, Dict[str, Any]]]): Relation fields to select, as in get_data.
+
+        Yields:
+            List[Dict[str, any]]: The records of one page; the last page may be shorter.
+        """
+        if page_size <= 0:
+            raise ValueError("page_size must be a positive number.")
+
+        offset = 0
+        while True:
+            response_json = self.get_data(app_name, database_name, dict_fields, limit=page_size, offset=offset,
+                                          relations=relations)
+            records = response_json[0].get("result", []) or []
+            if records:
+                yield records
+            if len(records) < page_size:
+                return
+            offset += page_size
+
+    def get_tables(self, app_name: str, database_name: str, dict_fields: Dict[str, str],
+                   relations: Dict[str, Dict[str, Any]], page_size: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Retrieve records with their related entities and flatten them into linked DataFrames.
+
+        Args:
+            app_name (str): The name of the Fibery app.
+            database_name (str): The name of the Fibery database.
+            dict_fields (Dict[str, str]): A dictionary of field names to retrieve.
+            relations (Dict[str, Dict[str, Any]]): Relation fields to select, as in get_data.
+            page_size (Optional[int]): Fetch the records page by page, None for a single query.
+
+        Returns:
+            Dict[str, pd.DataFrame]: Tables by path, see relations.flatten_records.
+        """
+        if page_size is None:
+            records = self.get_data(app_name, database_name, dict_fields, relations=relations)[0].get("result", [])
+        else:
+            records = [
+                record
+                for page in self.iter_data(app_name, database_name, dict_fields, page_size, relations=relations)
+                for record in page
+            ]
+        return flatten_records(records or [], database_name, relations, list(dict_fields))
+
+
 def main(
     url: str, 
     token: str, 
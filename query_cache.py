@@ -0,0 +1,198 @@
+import copy
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+class QueryCache:
+    def __init__(self, max_entries: int = 256, max_memory_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 60.0) -> None:
+        """
+        Initialize an LRU/TTL cache for Fibery query results.
+
+        Args:
+            max_entries (int): Maximum number of cached results.
+            max_memory_bytes (int): Upper bound for the estimated size of all cached results.
+            ttl_seconds (Optional[float]): Lifetime of an entry in seconds, None to disable expiry.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive number.")
+        if max_memory_bytes <= 0:
+            raise ValueError("max_memory_bytes must be a positive number.")
+
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (databases, value, size in bytes, expiry timestamp)
+        self._entries: "OrderedDict[str, Tuple[Tuple[str, ...], Any, int, Optional[float]]]" = OrderedDict()
+        self._keys_by_database: Dict[str, Set[str]] = {}
+        # Bumped by every invalidation, so results fetched before a write are not stored after it
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(payload: Any) -> str:
+        """
+        Build a cache key from a query payload.
+
+        Args:
+            payload (Any): The command payload sent to Fibery.
+
+        Returns:
+            str: The payload serialized with sorted keys, so equal queries give equal keys.
+        """
+        return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+
+    def generation(self, databases: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Return the invalidation generation of databases, to be read before a query is sent.
+
+        Args:
+            databases (Iterable[str]): The "app/database" names the query depends on.
+
+        Returns:
+            Tuple[int, ...]: A snapshot that put compares with the current generation.
+        """
+        with self._lock:
+            return (self._epoch,) + tuple(self._generations.get(database, 0) for database in dict.fromkeys(databases))
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return a copy of a cached result, or None on a miss or an expired entry.
+
+        Args:
+            key (str): The key built by make_key.
+
+        Returns:
+            Optional[Any]: The cached result or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at = entry[3]
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+
+        # Callers may modify what they get, the cached result must stay as fetched
+        return copy.deepcopy(value)
+
+    def put(self, key: str, database: str, value: Any, size: Optional[int] = None,
+            related: Iterable[str] = (), generation: Optional[Tuple[int, ...]] = None) -> None:
+        """
+        Store a copy of a result, evicting the least recently used entries when a bound is exceeded.
+
+        Args:
+            key (str): The key built by make_key.
+            database (str): The "app/database" name the result belongs to, used for invalidation.
+            value (Any): The result to store.
+            size (Optional[int]): Size of the result in bytes, estimated from its JSON form if omitted.
+            related (Iterable[str]): Further "app/database" names whose writes invalidate the result.
+            generation (Optional[Tuple[int, ...]]): Snapshot of generation([database, *related]) taken
+                before the query was sent; the result is dropped if a write invalidated it meanwhile.
+        """
+        databases = tuple(dict.fromkeys([database, *related]))
+        if size is None:
+            size = len(json.dumps(value, default=str))
+
+        # A single result larger than the whole budget is never cached
+        if size > self.max_memory_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        value = copy.deepcopy(value)
+
+        with self._lock:
+            current = (self._epoch,) + tuple(self._generations.get(name, 0) for name in databases)
+            if generation is not None and generation != current:
+                return
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (databases, value, size, expires_at)
+            for name in databases:
+                self._keys_by_database.setdefault(name, set()).add(key)
+            self._memory_bytes += size
+
+            while len(self._entries) > self.max_entries or self._memory_bytes > self.max_memory_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, database: str) -> int:
+        """
+        Drop every cached result of a database.
+
+        Args:
+            database (str): The "app/database" name.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        with self._lock:
+            self._generations[database] = self._generations.get(database, 0) + 1
+            keys = self._keys_by_database.pop(database, set())
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._keys_by_database.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache statistics.
+
+        Returns:
+            Dict[str, Any]: Entry count, memory use, hits, misses, hit ratio, evictions and invalidations.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_entries": self.max_entries,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry; the caller must hold the lock."""
+        databases, _, size, _ = self._entries.pop(key)
+        self._memory_bytes -= size
+        for database in databases:
+            keys = self._keys_by_database.get(database)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_database[database]
@@ -0,0 +1,209 @@
+import uuid
+import pandas as pd
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from constants import RELATION_FIELD_TYPES, SUPPORTED_FIELD_TYPES
+
+RELATION_SPEC_KEYS = {'database', 'fields', 'collection', 'limit', 'relations'}
+# Field types as returned by get_fields that can be selected as plain columns
+PRIMITIVE_FIELD_TYPES = {fibery_type.split('/')[-1] for fibery_type in SUPPORTED_FIELD_TYPES.values()}
+
+
+def is_relation(field_type: Any) -> bool:
+    """Check whether a create_database field type describes a relation."""
+    return isinstance(field_type, dict)
+
+
+def primitive_fields(fields: Dict[str, str]) -> Dict[str, str]:
+    """Keep the fields of a get_fields result that are not relations, so they can be selected as columns."""
+    return {name: field_type for name, field_type in fields.items() if field_type in PRIMITIVE_FIELD_TYPES}
+
+
+def relation_commands(app_name: str, database_name: str, field_name: str,
+                      spec: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Build the schema commands creating both sides of a relation.
+
+    Args:
+        app_name (str): The name of the Fibery app.
+        database_name (str): The database holding the relation field.
+        field_name (str): The name of the relation field.
+        spec (Dict[str, str]): {"type": a RELATION_FIELD_TYPES key, "to": related database,
+            "back": name of the field on the related database, database_name by default}.
+
+    Returns:
+        List[Dict[str, Any]]: Two "schema.field/create" commands sharing one relation id.
+    """
+    relation_type = spec.get('type')
+    if relation_type not in RELATION_FIELD_TYPES:
+        raise ValueError(f"Relation type '{relation_type}' is not supported. "
+                         f"Allowed types: {', '.join(RELATION_FIELD_TYPES.keys())}.")
+    if not spec.get('to'):
+        raise ValueError(f"Relation field '{field_name}' needs the related database in 'to'.")
+
+    target_name = spec['to']
+    back_name = spec.get('back', database_name)
+    is_collection, is_back_collection = RELATION_FIELD_TYPES[relation_type]
+    # The same definition always produces the same relation id
+    relation_id = str(uuid.uuid5(
+        uuid.NAMESPACE_DNS, f"{app_name}/{database_name}/{field_name}->{app_name}/{target_name}/{back_name}"
+    ))
+
+    return [
+        {
+            "command": "schema.field/create",
+            "args": {
+                "fibery/holder-type": f"{app_name}/{database_name}",
+                "fibery/name": f"{database_name}/{field_name}",
+                "fibery/type": f"{app_name}/{target_name}",
+                "fibery/meta": {
+                    "fibery/relation": relation_id,
+                    "fibery/collection?": is_collection
+                }
+            }
+        },
+        {
+            "command": "schema.field/create",
+            "args": {
+                "fibery/holder-type": f"{app_name}/{target_name}",
+                "fibery/name": f"{target_name}/{back_name}",
+                "fibery/type": f"{app_name}/{database_name}",
+                "fibery/meta": {
+                    "fibery/relation": relation_id,
+                    "fibery/collection?": is_back_collection
+                }
+            }
+        }
+    ]
+
+
+def _check_spec(field_name: str, spec: Dict[str, Any]) -> None:
+    unknown = set(spec) - RELATION_SPEC_KEYS
+    if unknown:
+        raise ValueError(f"Unknown keys for relation '{field_name}': {', '.join(sorted(unknown))}.")
+    if not spec.get('database'):
+        raise ValueError(f"Relation '{field_name}' needs the related database in 'database'.")
+    if spec.get('limit') is not None and not spec.get('collection', False):
+        raise ValueError(f"Relation '{field_name}' has a limit but is not a collection.")
+
+
+def build_select(database_name: str, fields: List[str],
+                 relations: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Any]:
+    """
+    Build a "q/select" with nested selections of related entities and collections.
+
+    Args:
+        database_name (str): The name of the queried database.
+        fields (List[str]): Primitive field names to select.
+        relations (Optional[Dict[str, Dict[str, Any]]]): Relation field names mapped to
+            {"database": related database, "fields": [...], "collection": bool,
+            "limit": int for collections, "relations": {...} for deeper levels}.
+
+    Returns:
+        List[Any]: The selection, including "fibery/id" on every level so the results can be linked.
+    """
+    select: List[Any] = ["fibery/id"] + [f"{database_name}/{field}" for field in fields]
+
+    for field_name, spec in (relations or {}).items():
+        _check_spec(field_name, spec)
+        nested = build_select(spec['database'], spec.get('fields', []), spec.get('relations'))
+        if spec.get('collection', False):
+            limit = spec.get('limit')
+            select.append({f"{database_name}/{field_name}": {
+                "q/select": nested,
+                "q/limit": "q/no-limit" if limit is None else limit
+            }})
+        else:
+            select.append({f"{database_name}/{field_name}": nested})
+
+    return select
+
+
+def related_databases(relations: Optional[Dict[str, Dict[str, Any]]]) -> Iterator[str]:
+    """Yield the names of all databases reached through a relation specification."""
+    for spec in (relations or {}).values():
+        yield spec['database']
+        yield from related_databases(spec.get('relations'))
+
+
+def _short_row(record: Dict[str, Any], relations: Dict[str, Dict[str, Any]],
+               database_name: str) -> Dict[str, Any]:
+    """Keep the primitive values of a record under short column names."""
+    relation_keys = {f"{database_name}/{field_name}" for field_name in relations}
+    return {
+        name.split('/')[-1]: value for name, value in record.items()
+        if name not in relation_keys
+    }
+
+
+def _declare_tables(path: str, fields: List[str], relations: Dict[str, Dict[str, Any]],
+                    columns: Dict[str, List[str]]) -> None:
+    """Collect the columns of every table of a relation specification, so tables exist without records."""
+    columns[path] = ["id"] + list(fields) + [
+        field_name for field_name, spec in relations.items() if not spec.get('collection', False)
+    ]
+    for field_name, spec in relations.items():
+        related_path = f"{path}.{field_name}"
+        _declare_tables(related_path, spec.get('fields', []), spec.get('relations') or {}, columns)
+        if spec.get('collection', False):
+            columns[f"{related_path}:links"] = ["source_id", "target_id"]
+
+
+def _collect(records: List[Dict[str, Any]], database_name: str, path: str,
+             relations: Dict[str, Dict[str, Any]], rows: Dict[str, Dict[str, Dict[str, Any]]],
+             links: Dict[str, List[Tuple[str, str]]]) -> None:
+    for record in records:
+        row = _short_row(record, relations, database_name)
+        for field_name, spec in relations.items():
+            related = record.get(f"{database_name}/{field_name}")
+            related_path = f"{path}.{field_name}"
+            if spec.get('collection', False):
+                links.setdefault(f"{related_path}:links", [])
+                for item in related or []:
+                    links[f"{related_path}:links"].append((record.get("fibery/id"), item.get("fibery/id")))
+                _collect(related or [], spec['database'], related_path, spec.get('relations') or {}, rows, links)
+            else:
+                row[field_name] = related.get("fibery/id") if related else None
+                _collect([related] if related else [], spec['database'], related_path,
+                         spec.get('relations') or {}, rows, links)
+        # Entities reached through several parents are kept once per table
+        path_rows = rows.setdefault(path, {})
+        path_rows[row["id"] if row.get("id") is not None else len(path_rows)] = row
+
+
+def flatten_records(records: List[Dict[str, Any]], database_name: str,
+                    relations: Optional[Dict[str, Dict[str, Any]]] = None,
+                    fields: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Flatten nested query results into linked tables.
+
+    The queried database becomes the table named database_name. A related entity becomes a row
+    of the table "<parent path>.<relation>" and its id a column of the parent row; a collection
+    also gets a "<parent path>.<relation>:links" table of (source_id, target_id) pairs. Every table
+    of the specification is returned, with its columns but no rows when nothing was found.
+
+    Args:
+        records (List[Dict[str, Any]]): The "result" of a query built with build_select.
+        database_name (str): The name of the queried database.
+        relations (Optional[Dict[str, Dict[str, Any]]]): The relation specification of the query.
+        fields (Optional[List[str]]): Primitive field names of the queried database, the columns
+            of its table when there are no records.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Tables by path, columns named by the short field names and "id".
+    """
+    columns: Dict[str, List[str]] = {}
+    _declare_tables(database_name, fields or [], relations or {}, columns)
+    rows: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    links: Dict[str, List[Tuple[str, str]]] = {}
+    _collect(records, database_name, database_name, relations or {}, rows, links)
+
+    tables = {}
+    for path, path_columns in columns.items():
+        if path.endswith(":links"):
+            tables[path] = pd.DataFrame(links.get(path, []), columns=path_columns)
+        elif rows.get(path):
+            tables[path] = pd.DataFrame(list(rows[path].values()))
+        else:
+            tables[path] = pd.DataFrame(columns=path_columns)
+    return tables
@@ -0,0 +1,160 @@
+import time
+import threading
+from typing import Any, Dict, Optional
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0) -> None:
+        """
+        Initialize a circuit breaker that fails fast after repeated failures.
+
+        After failure_threshold consecutive failures the breaker opens and rejects requests.
+        Once recovery_timeout has passed a single probe request is let through: its success
+        closes the breaker, its failure opens it again.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the breaker.
+            recovery_timeout (float): Seconds to stay open before probing for recovery.
+        """
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be a positive number.")
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """The current state, reporting "half-open" once the recovery timeout has passed."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent.
+
+        Returns:
+            bool: True if the breaker is closed or the request is the recovery probe.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._state = self.HALF_OPEN
+
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the breaker at the threshold or when the probe fails."""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """End a request without an outcome, e.g. one that failed before reaching the API, freeing the probe."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return breaker statistics.
+
+        Returns:
+            Dict[str, Any]: State, consecutive failures, how often it opened and rejected requests.
+        """
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+class RateLimiter:
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None) -> None:
+        """
+        Initialize a token bucket limiting HTTP requests per second.
+
+        Args:
+            rate_per_second (float): Requests allowed per second on average.
+            burst (Optional[float]): Requests allowed at once, one second of budget by default.
+        """
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be a positive number.")
+
+        self.rate_per_second = rate_per_second
+        self.capacity = burst if burst is not None else max(1.0, rate_per_second)
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self) -> float:
+        """
+        Take the budget of one request, blocking until it is available.
+
+        Returns:
+            float: Seconds waited for the budget.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate_per_second)
+            self._refilled_at = now
+            # Waiting callers reserve their token up front, so they are served in arrival order
+            self._tokens -= 1.0
+            delay = -self._tokens / self.rate_per_second if self._tokens < 0 else 0.0
+            self.acquired += 1
+            self.waited_seconds += delay
+
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return limiter statistics.
+
+        Returns:
+            Dict[str, Any]: Rate, acquired requests and the total seconds spent waiting for budget.
+        """
+        with self._lock:
+            return {
+                "rate_per_second": self.rate_per_second,
+                "acquired": self.acquired,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
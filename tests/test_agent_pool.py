@@ -0,0 +1,106 @@
+import time
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from agent_pool import AgentPool
+from main import FiberyAgent, FiberyError
+
+
+class TestAgentPool(unittest.TestCase):
+    def test_tenant_agents_use_own_sessions(self):
+        with AgentPool(max_concurrency=2) as pool:
+            first = pool.add_tenant('acme', 'https://acme.fibery.io/api/commands', 'token-a')
+            second = pool.add_tenant('globex', 'https://globex.fibery.io/api/commands', 'token-b')
+
+            self.assertIsNot(first.session, second.session)
+            with patch.object(first.session, 'post') as mock_post:
+                mock_post.return_value = MagicMock(status_code=200)
+                pool.submit('acme', FiberyAgent.get_schema).result(timeout=5)
+                mock_post.assert_called_once()
+
+    def test_weighted_round_robin_order(self):
+        """With one worker, queued work of a heavy tenant does not starve a light one."""
+        order = []
+        gate = threading.Event()
+
+        def job(agent, label):
+            gate.wait(timeout=5)
+            order.append(label)
+
+        pool = AgentPool(max_concurrency=1)
+        pool.add_tenant('busy', 'https://busy.fibery.io', 'token', weight=2)
+        pool.add_tenant('quiet', 'https://quiet.fibery.io', 'token', weight=1)
+
+        # Occupy the only worker so the rest of the work queues up
+        blocker = pool.submit('busy', job, 'blocker')
+        time.sleep(0.05)
+        futures = [pool.submit('busy', job, f'busy-{i}') for i in range(6)]
+        futures += [pool.submit('quiet', job, f'quiet-{i}') for i in range(3)]
+        gate.set()
+        pool.close()
+
+        self.assertTrue(all(future.done() for future in futures + [blocker]))
+        labels = [label.split('-')[0] for label in order[1:]]
+        self.assertEqual(labels, ['busy', 'quiet', 'busy'] * 3)
+
+    def test_total_and_tenant_concurrency_caps(self):
+        lock = threading.Lock()
+        running = {'total': 0, 'max_total': 0, 'acme': 0, 'max_acme': 0}
+
+        def job(agent, tenant):
+            with lock:
+                running['total'] += 1
+                running[tenant] = running.get(tenant, 0) + 1
+                running['max_total'] = max(running['max_total'], running['total'])
+                if tenant == 'acme':
+                    running['max_acme'] = max(running['max_acme'], running['acme'])
+            time.sleep(0.02)
+            with lock:
+                running['total'] -= 1
+                running[tenant] -= 1
+
+        with AgentPool(max_concurrency=3) as pool:
+            pool.add_tenant('acme', 'https://acme.fibery.io', 'token', max_concurrency=1)
+            pool.add_tenant('globex', 'https://globex.fibery.io', 'token', max_concurrency=4)
+            futures = [pool.submit(tenant, job, tenant) for tenant in ['acme', 'globex'] * 6]
+            for future in futures:
+                future.result(timeout=5)
+
+        self.assertLessEqual(running['max_total'], 3)
+        self.assertEqual(running['max_acme'], 1)
+
+    def test_rate_budget_per_request(self):
+        """The budget limits HTTP requests, also when a single job sends many of them."""
+        with AgentPool(max_concurrency=4) as pool:
+            agent = pool.add_tenant('acme', 'https://acme.fibery.io', 'token', rate_per_second=20)
+            with patch.object(agent.session, 'post') as mock_post:
+                mock_post.return_value = MagicMock(status_code=200)
+                started = time.monotonic()
+                pool.submit('acme', lambda agent: [agent.get_schema() for _ in range(25)]).result(timeout=5)
+                elapsed = time.monotonic() - started
+
+            self.assertEqual(mock_post.call_count, 25)
+            self.assertEqual(agent.get_stats()["rate_limiter"]["acquired"], 25)
+
+        # A burst of 20 is allowed, the remaining 5 need a quarter of a second of budget
+        self.assertGreaterEqual(elapsed, 0.2)
+
+    def test_errors_and_stats(self):
+        def fail(agent):
+            raise FiberyError("Mocked FiberyError")
+
+        with AgentPool(max_concurrency=2) as pool:
+            pool.add_tenant('acme', 'https://acme.fibery.io', 'token')
+            future = pool.submit('acme', fail)
+            with self.assertRaises(FiberyError):
+                future.result(timeout=5)
+
+            stats = pool.get_stats()
+            self.assertEqual(stats['tenants']['acme']['failed'], 1)
+            self.assertEqual(stats['inflight'], 0)
+            with self.assertRaises(KeyError):
+                pool.submit('unknown', fail)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from main import FiberyAgent
+from entity_index import EntityIndex, natural_key, derive_entity_id, content_hash
+
+
+class TestEntityIndex(unittest.TestCase):
+    def test_derived_id_matches_legacy_scheme(self):
+        """The default key fields keep the uuid5(NameSurname + Age) ids of existing entities."""
+        import uuid
+        data = {'NameSurname': 'Stiven Fox', 'Age': 25}
+        expected = str(uuid.uuid5(uuid.NAMESPACE_DNS, "Stiven Fox25"))
+        self.assertEqual(derive_entity_id(data, ['NameSurname', 'Age']), expected)
+
+    def test_index_persists_between_connections(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.sqlite")
+            index = EntityIndex(path)
+            index.upsert("App/Db", [("k1", "id-1", "h1")])
+            index.set_watermark("App/Db", "2024-01-01T00:00:00.000Z")
+            index.close()
+
+            reopened = EntityIndex(path)
+            self.assertEqual(reopened.lookup("App/Db", "k1"), ("id-1", "h1"))
+            self.assertEqual(reopened.get_watermark("App/Db"), "2024-01-01T00:00:00.000Z")
+            reopened.remove("App/Db", ["k1"])
+            self.assertIsNone(reopened.lookup("App/Db", "k1"))
+            reopened.close()
+
+
+class TestFiberyAgentIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = EntityIndex()
+        self.agent = FiberyAgent('https://api.fibery.io', 'your_token', index=self.index,
+                                 key_fields={'Test App/Projects': ['Code']})
+
+    @patch('requests.post')
+    def test_configured_key_fields(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"success": True}]
+        mock_post.return_value = mock_response
+
+        self.agent.add_entity('Test App', 'Projects', [{'Code': 'P-1', 'Title': 'Alpha'}])
+
+        entity = mock_post.call_args.kwargs["json"][0]["args"]["entity"]
+        self.assertEqual(entity["fibery/id"], derive_entity_id({'Code': 'P-1'}, ['Code']))
+        self.assertEqual(self.index.count('Test App/Projects'), 1)
+
+    @patch('requests.post')
+    def test_upsert_skips_unchanged_and_updates_changed(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"success": True}]
+        mock_post.return_value = mock_response
+        entity = {'NameSurname': 'Test Entity', 'Age': 30, 'Salary': 100}
+        self.agent.add_entity('Test App', 'Test Database', [entity])
+
+        self.assertIsNone(self.agent.upsert_entities('Test App', 'Test Database', [entity]))
+        self.assertEqual(mock_post.call_count, 1)
+
+        self.agent.upsert_entities('Test App', 'Test Database', [dict(entity, Salary=200),
+                                                                 {'NameSurname': 'New', 'Age': 1}])
+        commands = mock_post.call_args.kwargs["json"]
+        self.assertEqual([command["command"] for command in commands],
+                         ["fibery.entity/update", "fibery.entity/create"])
+
+    @patch('requests.post')
+    def test_delete_removes_from_index(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"success": True}]
+        mock_post.return_value = mock_response
+        entity = {'NameSurname': 'Test Entity', 'Age': 30}
+        self.agent.add_entity('Test App', 'Test Database', [entity])
+        self.agent.delete_entities('Test App', 'Test Database', [entity])
+
+        self.assertEqual(self.index.count('Test App/Test Database'), 0)
+
+    @patch('requests.post')
+    def test_sync_index_uses_watermark(self, mock_post):
+        schema = [{"result": {"fibery/types": [{
+            "fibery/name": "Test App/Test Database",
+            "fibery/fields": [
+                {"fibery/name": "Test Database/NameSurname", "fibery/type": "fibery/text"},
+                {"fibery/name": "Test Database/Age", "fibery/type": "fibery/int"},
+                {"fibery/name": "Test Database/Department", "fibery/type": "Test App/Departments"},
+            ],
+        }]}}]
+        records = [{"success": True, "result": [{
+            "fibery/id": "remote-id",
+            "fibery/modification-date": "2024-05-01T10:00:00.000Z",
+            "Test Database/NameSurname": "Remote",
+            "Test Database/Age": 40,
+        }]}]
+        schema_response = MagicMock(status_code=200)
+        schema_response.json.return_value = schema
+        records_response = MagicMock(status_code=200)
+        records_response.json.return_value = records
+        empty_response = MagicMock(status_code=200)
+        empty_response.json.return_value = [{"success": True, "result": []}]
+        mock_post.side_effect = [schema_response, records_response, schema_response, empty_response]
+
+        self.assertEqual(self.agent.sync_index('Test App', 'Test Database'), 1)
+        select = mock_post.call_args.kwargs["json"][0]["args"]["query"]["q/select"]
+        self.assertNotIn("Test Database/Department", select)
+        key = natural_key({'NameSurname': 'Remote', 'Age': 40}, ['NameSurname', 'Age'])
+        self.assertEqual(self.index.lookup('Test App/Test Database', key),
+                         ("remote-id", content_hash({'NameSurname': 'Remote', 'Age': 40})))
+
+        self.agent.sync_index('Test App', 'Test Database')
+        args = mock_post.call_args.kwargs["json"][0]["args"]
+        self.assertIn("q/where", args["query"])
+        self.assertEqual(args["params"], {"$since": "2024-05-01T10:00:00.000Z"})
+
+
+if __name__ == '__main__':
+    unittest.main()
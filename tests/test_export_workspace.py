@@ -0,0 +1,91 @@
+import os
+import json
+import tempfile
+import unittest
+import pandas as pd
+from unittest.mock import patch, MagicMock
+from main import FiberyAgent
+from export_workspace import export_app, pq
+
+SCHEMA = [{"result": {"fibery/types": [
+    {
+        "fibery/name": "Test App/Employees",
+        "fibery/meta": {"fibery/domain?": True},
+        "fibery/fields": [
+            {"fibery/name": "Employees/NameSurname", "fibery/type": "fibery/text"},
+            {"fibery/name": "Employees/Age", "fibery/type": "fibery/int"},
+            {"fibery/name": "fibery/id", "fibery/type": "fibery/uuid"},
+        ],
+    },
+    {
+        "fibery/name": "Test App/Empty",
+        "fibery/meta": {"fibery/domain?": True},
+        "fibery/fields": [{"fibery/name": "Empty/Title", "fibery/type": "fibery/text"}],
+    },
+    {"fibery/name": "Other App/Ignored", "fibery/meta": {"fibery/domain?": True}, "fibery/fields": []},
+]}}]
+
+EMPLOYEES = [{"Employees/NameSurname": f"Person {i}", "Employees/Age": 20 + i} for i in range(5)]
+
+
+def fake_post(url, headers=None, json=None, timeout=None):
+    response = MagicMock()
+    response.status_code = 200
+    command = json[0]
+    if command["command"] == "fibery.schema/query":
+        response.json.return_value = SCHEMA
+        return response
+
+    query = command["args"]["query"]
+    records = EMPLOYEES if query["q/from"] == "Test App/Employees" else []
+    offset, limit = query["q/offset"], query["q/limit"]
+    response.json.return_value = [{"success": True, "result": records[offset:offset + limit]}]
+    return response
+
+
+class TestExportWorkspace(unittest.TestCase):
+    @patch('requests.post', side_effect=fake_post)
+    def test_export_app_to_csv(self, mock_post):
+        agent = FiberyAgent('https://api.fibery.io', 'your_token')
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            manifest = export_app(agent, 'Test App', output_dir, max_workers=2, page_size=2, file_format='csv')
+
+            self.assertEqual(manifest["total_rows"], 5)
+            entries = {entry["database"]: entry for entry in manifest["databases"]}
+            self.assertEqual(set(entries), {"Employees", "Empty"})
+            self.assertEqual(entries["Employees"]["rows"], 5)
+            self.assertEqual(entries["Employees"]["pages"], 3)
+            self.assertEqual(entries["Empty"]["rows"], 0)
+
+            df_data = pd.read_csv(os.path.join(output_dir, "Employees.csv"))
+            self.assertEqual(list(df_data.columns), ["NameSurname", "Age"])
+            self.assertEqual(df_data["Age"].tolist(), [20, 21, 22, 23, 24])
+
+            with open(os.path.join(output_dir, "manifest.json")) as manifest_file:
+                self.assertEqual(json.load(manifest_file)["total_rows"], 5)
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    @patch('requests.post', side_effect=fake_post)
+    def test_export_app_to_parquet(self, mock_post):
+        agent = FiberyAgent('https://api.fibery.io', 'your_token')
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            manifest = export_app(agent, 'Test App', output_dir, page_size=2)
+
+            self.assertEqual(manifest["format"], "parquet")
+            df_data = pd.read_parquet(os.path.join(output_dir, "Employees.parquet"))
+            self.assertEqual(len(df_data), 5)
+            self.assertEqual(str(df_data["Age"].dtype), "int64")
+
+    @patch('requests.post', side_effect=fake_post)
+    def test_export_app_rejects_unknown_format(self, mock_post):
+        agent = FiberyAgent('https://api.fibery.io', 'your_token')
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            with self.assertRaises(ValueError):
+                export_app(agent, 'Test App', output_dir, file_format='xlsx')
+
+
+if __name__ == '__main__':
+    unittest.main()
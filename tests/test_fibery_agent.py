@@ -25,7 +25,7 @@ class TestFiberyAgent(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
         mock_post.assert_called_once_with(
-            self.agent.url, headers=ANY, json=[{"command": "fibery.schema/query"}]
+            self.agent.url, headers=ANY, json=[{"command": "fibery.schema/query"}], timeout=ANY
         )
 
     @patch('requests.post')
@@ -41,7 +41,7 @@ class TestFiberyAgent(unittest.TestCase):
         
         self.assertIn("[Fibery Error] Failed to get schema", str(context.exception))
         mock_post.assert_called_once_with(
-            self.agent.url, headers=ANY, json=[{"command": "fibery.schema/query"}]
+            self.agent.url, headers=ANY, json=[{"command": "fibery.schema/query"}], timeout=ANY
         )
 
     @patch('requests.post')
@@ -54,7 +54,7 @@ class TestFiberyAgent(unittest.TestCase):
 
         self.assertIn("Failed to send data to Fibery", str(context.exception))
         mock_post.assert_called_once_with(
-            self.agent.url, headers=ANY, json=[{"command": "fibery.schema/query"}]
+            self.agent.url, headers=ANY, json=[{"command": "fibery.schema/query"}], timeout=ANY
         )
 
     @patch('requests.post')
@@ -0,0 +1,151 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from main import FiberyAgent
+from query_cache import QueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_key_is_normalized(self):
+        """Payloads that differ only in key order share a key."""
+        first = QueryCache.make_key({"a": 1, "b": [1, 2]})
+        second = QueryCache.make_key({"b": [1, 2], "a": 1})
+        self.assertEqual(first, second)
+
+    def test_lru_eviction_by_entries(self):
+        cache = QueryCache(max_entries=2)
+        cache.put("k1", "App/Db", [1])
+        cache.put("k2", "App/Db", [2])
+        cache.get("k1")  # k1 becomes most recently used
+        cache.put("k3", "App/Db", [3])
+
+        self.assertIsNone(cache.get("k2"))
+        self.assertEqual(cache.get("k1"), [1])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_eviction_by_memory(self):
+        cache = QueryCache(max_memory_bytes=100)
+        cache.put("k1", "App/Db", "x", size=60)
+        cache.put("k2", "App/Db", "y", size=60)
+
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["memory_bytes"], 60)
+        self.assertIsNone(cache.get("k1"))
+
+    @patch('query_cache.time.monotonic')
+    def test_ttl_expiry(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        cache = QueryCache(ttl_seconds=10)
+        cache.put("k1", "App/Db", [1])
+
+        mock_monotonic.return_value = 111.0
+        self.assertIsNone(cache.get("k1"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_put_after_invalidation_is_dropped(self):
+        """A result fetched before a write must not be stored once the write invalidated it."""
+        cache = QueryCache(ttl_seconds=None)
+        generation = cache.generation(["App/Db", "App/Db"])
+        cache.invalidate("App/Db")
+        cache.put("k1", "App/Db", [1], related=["App/Db"], generation=generation)
+
+        self.assertIsNone(cache.get("k1"))
+        cache.put("k1", "App/Db", [2], generation=cache.generation(["App/Db"]))
+        self.assertEqual(cache.get("k1"), [2])
+
+    def test_invalidate_database(self):
+        cache = QueryCache()
+        cache.put("k1", "App/Db", [1])
+        cache.put("k2", "App/Other", [2])
+
+        self.assertEqual(cache.invalidate("App/Db"), 1)
+        self.assertIsNone(cache.get("k1"))
+        self.assertEqual(cache.get("k2"), [2])
+
+
+class TestFiberyAgentCache(unittest.TestCase):
+    def setUp(self):
+        self.agent = FiberyAgent('https://api.fibery.io', 'your_token', cache=QueryCache())
+
+    @patch('requests.post')
+    def test_get_data_served_from_cache(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = b'[{"result": [{"NameSurname": "Test"}]}]'
+        mock_response.json.return_value = [{"result": [{"NameSurname": "Test"}]}]
+        mock_post.return_value = mock_response
+
+        fields = {'NameSurname': 'text'}
+        first = self.agent.get_data('Test App', 'Test Database', fields)
+        second = self.agent.get_data('Test App', 'Test Database', fields)
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_post.call_count, 1)
+        stats = self.agent.get_stats()["cache"]
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+        self.assertEqual(stats["memory_bytes"], len(mock_response.content))
+
+    @patch('requests.post')
+    def test_cached_results_are_copies(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"result": [{"NameSurname": "Test"}]}]
+        mock_post.return_value = mock_response
+
+        fields = {'NameSurname': 'text'}
+        self.agent.get_data('Test App', 'Test Database', fields)[0]["result"].clear()
+        self.agent.get_data('Test App', 'Test Database', fields)[0]["result"].clear()
+
+        self.assertEqual(self.agent.get_data('Test App', 'Test Database', fields),
+                         [{"result": [{"NameSurname": "Test"}]}])
+        self.assertEqual(mock_post.call_count, 1)
+
+    @patch('requests.post')
+    def test_write_during_query_is_not_masked(self, mock_post):
+        fields = {'NameSurname': 'text'}
+        stale = [{"result": [{"Test Database/NameSurname": "Before"}]}]
+        fresh = [{"result": [{"Test Database/NameSurname": "After"}]}]
+
+        def post(url, headers=None, json=None, timeout=None):
+            response = MagicMock()
+            response.status_code = 200
+            if json[0]["command"] == "fibery.entity/query":
+                # The write completes while the query is in flight
+                if not post.wrote:
+                    post.wrote = True
+                    self.agent.add_entity('Test App', 'Test Database', [{'NameSurname': 'After', 'Age': 1}])
+                    response.json.return_value = stale
+                else:
+                    response.json.return_value = fresh
+            else:
+                response.json.return_value = [{"success": True}]
+            return response
+
+        post.wrote = False
+        mock_post.side_effect = post
+
+        self.assertEqual(self.agent.get_data('Test App', 'Test Database', fields), stale)
+        self.assertEqual(self.agent.get_data('Test App', 'Test Database', fields), fresh)
+        self.assertEqual(self.agent.get_stats()["cache"]["hits"], 0)
+
+    @patch('requests.post')
+    def test_writes_invalidate_cache(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"success": True, "result": []}]
+        mock_post.return_value = mock_response
+
+        fields = {'NameSurname': 'text'}
+        self.agent.get_data('Test App', 'Test Database', fields)
+        self.agent.add_entity('Test App', 'Test Database', [{'NameSurname': 'Test Entity', 'Age': 30}])
+        self.agent.get_data('Test App', 'Test Database', fields)
+        self.agent.delete_database('Test App', 'Test Database')
+        self.agent.get_data('Test App', 'Test Database', fields)
+
+        self.assertEqual(mock_post.call_count, 5)
+        self.assertEqual(self.agent.get_stats()["cache"]["hits"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
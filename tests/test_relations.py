@@ -0,0 +1,163 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from main import FiberyAgent
+from query_cache import QueryCache
+from relations import build_select, flatten_records
+
+RELATIONS = {
+    'Department': {'database': 'Departments', 'fields': ['Name']},
+    'Projects': {'database': 'Projects', 'fields': ['Title'], 'collection': True, 'limit': 2},
+}
+
+RECORDS = [
+    {
+        "fibery/id": "e1",
+        "Employees/NameSurname": "Stiven Fox",
+        "Employees/Department": {"fibery/id": "d1", "Departments/Name": "Department A"},
+        "Employees/Projects": [
+            {"fibery/id": "p1", "Projects/Title": "Alpha"},
+            {"fibery/id": "p2", "Projects/Title": "Beta"},
+        ],
+    },
+    {
+        "fibery/id": "e2",
+        "Employees/NameSurname": "Foxy Stivenson",
+        "Employees/Department": {"fibery/id": "d1", "Departments/Name": "Department A"},
+        "Employees/Projects": [{"fibery/id": "p1", "Projects/Title": "Alpha"}],
+    },
+    {
+        "fibery/id": "e3",
+        "Employees/NameSurname": "No Department",
+        "Employees/Department": None,
+        "Employees/Projects": [],
+    },
+]
+
+
+class TestRelations(unittest.TestCase):
+    def test_build_select(self):
+        select = build_select('Employees', ['NameSurname'], RELATIONS)
+
+        self.assertEqual(select, [
+            "fibery/id",
+            "Employees/NameSurname",
+            {"Employees/Department": ["fibery/id", "Departments/Name"]},
+            {"Employees/Projects": {"q/select": ["fibery/id", "Projects/Title"], "q/limit": 2}},
+        ])
+
+    def test_build_select_rejects_limit_on_single_relation(self):
+        with self.assertRaises(ValueError):
+            build_select('Employees', [], {'Department': {'database': 'Departments', 'limit': 5}})
+
+    def test_flatten_records(self):
+        tables = flatten_records(RECORDS, 'Employees', RELATIONS)
+
+        employees = tables['Employees']
+        self.assertEqual(employees['id'].tolist(), ['e1', 'e2', 'e3'])
+        self.assertEqual(employees['Department'].tolist(), ['d1', 'd1', None])
+        self.assertEqual(tables['Employees.Department'].to_dict('records'),
+                         [{"id": "d1", "Name": "Department A"}])
+        self.assertEqual(sorted(tables['Employees.Projects']['id']), ['p1', 'p2'])
+        self.assertEqual(tables['Employees.Projects:links'].values.tolist(),
+                         [['e1', 'p1'], ['e1', 'p2'], ['e2', 'p1']])
+
+
+    def test_flatten_records_without_results(self):
+        tables = flatten_records([], 'Employees', RELATIONS, ['NameSurname'])
+
+        self.assertEqual(sorted(tables), ['Employees', 'Employees.Department',
+                                          'Employees.Projects', 'Employees.Projects:links'])
+        self.assertTrue(all(table.empty for table in tables.values()))
+        self.assertEqual(tables['Employees'].columns.tolist(), ['id', 'NameSurname', 'Department'])
+        self.assertEqual(tables['Employees.Projects'].columns.tolist(), ['id', 'Title'])
+        self.assertEqual(tables['Employees.Projects:links'].columns.tolist(), ['source_id', 'target_id'])
+
+class TestFiberyAgentRelations(unittest.TestCase):
+    @patch('requests.post')
+    def test_create_database_with_relation(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"success": True}]
+        mock_post.return_value = mock_response
+        agent = FiberyAgent('https://api.fibery.io', 'your_token')
+
+        agent.create_database('Test App', 'Employees', {
+            'NameSurname': 'text',
+            'Department': {'type': 'many-to-one', 'to': 'Departments', 'back': 'Employees'},
+        })
+
+        commands = mock_post.call_args.kwargs["json"][0]["args"]["commands"]
+        self.assertEqual([command["command"] for command in commands],
+                         ["schema.type/create", "schema.field/create", "schema.field/create"])
+        holder, back = commands[1]["args"], commands[2]["args"]
+        self.assertEqual(holder["fibery/name"], "Employees/Department")
+        self.assertEqual(holder["fibery/type"], "Test App/Departments")
+        self.assertFalse(holder["fibery/meta"]["fibery/collection?"])
+        self.assertEqual(back["fibery/holder-type"], "Test App/Departments")
+        self.assertTrue(back["fibery/meta"]["fibery/collection?"])
+        self.assertEqual(holder["fibery/meta"]["fibery/relation"], back["fibery/meta"]["fibery/relation"])
+        field_names = [field["fibery/name"] for field in commands[0]["args"]["fibery/fields"]]
+        self.assertNotIn("Employees/Department", field_names)
+
+    @patch('requests.post')
+    def test_create_relations_of_existing_database(self, mock_post):
+        exists = [{"success": False, "result": {"message": "Type with name database already exists"}}]
+        exists_response = MagicMock(status_code=200)
+        exists_response.json.return_value = exists
+        created_response = MagicMock(status_code=200)
+        created_response.json.return_value = [{"success": True}]
+        mock_post.side_effect = [exists_response, created_response]
+        agent = FiberyAgent('https://api.fibery.io', 'your_token')
+
+        created = agent.create_database('Test App', 'Employees', {
+            'NameSurname': 'text',
+            'Department': {'type': 'many-to-one', 'to': 'Departments', 'back': 'Employees'},
+        })
+
+        self.assertTrue(created)
+        commands = mock_post.call_args.kwargs["json"][0]["args"]["commands"]
+        self.assertEqual([command["command"] for command in commands],
+                         ["schema.field/create", "schema.field/create"])
+
+    @patch('requests.post')
+    def test_create_database_rejects_unknown_relation_type(self, mock_post):
+        agent = FiberyAgent('https://api.fibery.io', 'your_token')
+
+        with self.assertRaises(ValueError):
+            agent.create_database('Test App', 'Employees', {
+                'NameSurname': 'text',
+                'Department': {'type': 'parent-of', 'to': 'Departments'},
+            })
+        mock_post.assert_not_called()
+
+    @patch('requests.post')
+    def test_get_tables_in_one_query(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"success": True, "result": RECORDS}]
+        mock_post.return_value = mock_response
+        agent = FiberyAgent('https://api.fibery.io', 'your_token')
+
+        tables = agent.get_tables('Test App', 'Employees', {'NameSurname': 'text'}, RELATIONS)
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(len(tables['Employees']), 3)
+        self.assertEqual(len(tables['Employees.Projects:links']), 3)
+
+    @patch('requests.post')
+    def test_writes_to_related_database_invalidate_cache(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"success": True, "result": RECORDS}]
+        mock_post.return_value = mock_response
+        agent = FiberyAgent('https://api.fibery.io', 'your_token', cache=QueryCache())
+
+        agent.get_data('Test App', 'Employees', {'NameSurname': 'text'}, relations=RELATIONS)
+        agent.delete_entities('Test App', 'Projects', [{'NameSurname': 'Alpha', 'Age': 1}])
+        agent.get_data('Test App', 'Employees', {'NameSurname': 'text'}, relations=RELATIONS)
+
+        self.assertEqual(mock_post.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
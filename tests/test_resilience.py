@@ -0,0 +1,202 @@
+import time
+import threading
+import unittest
+import requests
+from unittest.mock import patch, MagicMock
+from main import FiberyAgent, FiberyError
+from resilience import CircuitBreaker
+
+
+def ok_response():
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = [{"success": True, "result": []}]
+    return response
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    @patch('resilience.time.monotonic')
+    def test_opens_and_probes_for_recovery(self, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10)
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        mock_monotonic.return_value = 10.0
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())   # the probe
+        self.assertFalse(breaker.allow())  # only one probe at a time
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        mock_monotonic.return_value = 20.0
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.stats()["times_opened"], 2)
+
+
+class TestFiberyAgentResilience(unittest.TestCase):
+    @patch('requests.post')
+    def test_timeouts_per_operation(self, mock_post):
+        mock_post.return_value = ok_response()
+        agent = FiberyAgent('https://api.fibery.io', 'your_token', timeouts={'schema': 5, 'read': 7})
+
+        agent.get_schema()
+        self.assertEqual(mock_post.call_args.kwargs["timeout"], 5)
+        agent.get_data('Test App', 'Test Database', {'NameSurname': 'text'})
+        self.assertEqual(mock_post.call_args.kwargs["timeout"], 7)
+
+    @patch('requests.post', side_effect=requests.Timeout("Mocked timeout"))
+    def test_breaker_fails_fast(self, mock_post):
+        agent = FiberyAgent('https://api.fibery.io', 'your_token',
+                            breaker=CircuitBreaker(failure_threshold=2, recovery_timeout=60))
+
+        for _ in range(3):
+            with self.assertRaises(FiberyError):
+                agent.get_schema()
+
+        self.assertEqual(mock_post.call_count, 2)
+        stats = agent.get_stats()
+        self.assertEqual(stats["breaker"]["state"], CircuitBreaker.OPEN)
+        self.assertEqual(stats["requests"]["timeouts"], 2)
+        self.assertEqual(stats["requests"]["breaker_rejections"], 1)
+
+    @patch('requests.post')
+    def test_unexpected_error_releases_probe(self, mock_post):
+        mock_post.side_effect = requests.Timeout("Mocked timeout")
+        agent = FiberyAgent('https://api.fibery.io', 'your_token',
+                            breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=0))
+        with self.assertRaises(FiberyError):
+            agent.get_schema()
+
+        # The probe fails outside the HTTP exchange, e.g. on a payload that cannot be serialized
+        mock_post.side_effect = TypeError("Object of type datetime is not JSON serializable")
+        with self.assertRaises(TypeError):
+            agent.get_schema()
+
+        mock_post.side_effect = None
+        mock_post.return_value = ok_response()
+        agent.get_schema()
+        self.assertEqual(agent.breaker.state, CircuitBreaker.CLOSED)
+
+    @patch('requests.post')
+    def test_client_errors_do_not_open_breaker(self, mock_post):
+        response = MagicMock(status_code=404)
+        response.raise_for_status.side_effect = requests.HTTPError("Not found", response=response)
+        mock_post.return_value = response
+        agent = FiberyAgent('https://api.fibery.io', 'your_token', breaker=CircuitBreaker(failure_threshold=1))
+
+        with self.assertRaises(FiberyError):
+            agent.get_schema()
+        self.assertEqual(agent.breaker.state, CircuitBreaker.CLOSED)
+
+    @patch('requests.post')
+    def test_rate_limiter_is_taken_per_request(self, mock_post):
+        mock_post.return_value = ok_response()
+        limiter = MagicMock()
+        agent = FiberyAgent('https://api.fibery.io', 'your_token', rate_limiter=limiter)
+
+        agent.get_schema()
+        agent.get_data('Test App', 'Test Database', {'NameSurname': 'text'})
+        self.assertEqual(limiter.acquire.call_count, 2)
+
+    @patch('requests.post')
+    def test_slow_read_is_hedged(self, mock_post):
+        release = threading.Event()
+
+        def slow_then_fast(url, headers=None, json=None, timeout=None):
+            if not threading.current_thread().name.startswith("fibery-hedge"):
+                release.wait(timeout=5)
+            return ok_response()
+
+        mock_post.side_effect = slow_then_fast
+        agent = FiberyAgent('https://api.fibery.io', 'your_token', hedge_after=0.05)
+
+        started = time.perf_counter()
+        response = agent.get_data('Test App', 'Test Database', {'NameSurname': 'text'})
+        elapsed = time.perf_counter() - started
+        release.set()
+
+        # The hedge answers first, the call does not wait for the slow first attempt
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(response, [{"success": True, "result": []}])
+        self.assertEqual(mock_post.call_count, 2)
+        stats = agent.get_stats()["requests"]
+        self.assertEqual(stats["hedged"], 1)
+        self.assertEqual(stats["hedge_wins"], 1)
+
+    @patch('requests.post')
+    def test_hedge_replaces_failed_slow_read(self, mock_post):
+        hedge_sent = threading.Event()
+
+        def slow_error_then_fast(url, headers=None, json=None, timeout=None):
+            if threading.current_thread().name.startswith("fibery-hedge"):
+                hedge_sent.set()
+                return ok_response()
+            hedge_sent.wait(timeout=5)
+            response = MagicMock(status_code=503)
+            response.raise_for_status.side_effect = requests.HTTPError("Unavailable", response=response)
+            return response
+
+        mock_post.side_effect = slow_error_then_fast
+        agent = FiberyAgent('https://api.fibery.io', 'your_token', hedge_after=0.05)
+
+        response = agent.get_data('Test App', 'Test Database', {'NameSurname': 'text'})
+
+        self.assertEqual(response, [{"success": True, "result": []}])
+        self.assertEqual(mock_post.call_count, 2)
+        stats = agent.get_stats()["requests"]
+        self.assertEqual(stats["hedged"], 1)
+        self.assertEqual(stats["hedge_wins"], 1)
+
+    @patch('requests.post')
+    def test_hedges_are_limited_by_budget(self, mock_post):
+        release = threading.Event()
+        hedge_threads = []
+
+        def slow(url, headers=None, json=None, timeout=None):
+            if threading.current_thread().name.startswith("fibery-hedge"):
+                hedge_threads.append(threading.current_thread().name)
+            release.wait(timeout=5)
+            return ok_response()
+
+        mock_post.side_effect = slow
+        agent = FiberyAgent('https://api.fibery.io', 'your_token', hedge_after=0.05, max_hedge_ratio=0.1)
+        readers = [
+            threading.Thread(target=agent.get_data, args=('Test App', 'Test Database', {'NameSurname': 'text'}))
+            for _ in range(2)
+        ]
+        for reader in readers:
+            reader.start()
+        time.sleep(0.3)
+        release.set()
+        for reader in readers:
+            reader.join(timeout=5)
+
+        self.assertEqual(len(hedge_threads), 1)
+        stats = agent.get_stats()["requests"]
+        self.assertEqual(stats["hedged"], 1)
+        self.assertEqual(stats["hedges_skipped"], 1)
+        self.assertEqual(stats["hedge_wins"], 0)
+
+    @patch('requests.post')
+    def test_writes_are_never_hedged(self, mock_post):
+        def slow(url, headers=None, json=None, timeout=None):
+            time.sleep(0.1)
+            return ok_response()
+
+        mock_post.side_effect = slow
+        agent = FiberyAgent('https://api.fibery.io', 'your_token', hedge_after=0.01)
+
+        agent.add_entity('Test App', 'Test Database', [{'NameSurname': 'Test Entity', 'Age': 30}])
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(agent.get_stats()["requests"]["hedged"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import json
+import tempfile
+import threading
+import unittest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch, MagicMock
+from main import FiberyAgent, FiberyError
+from traffic import TrafficRecorder, load_trace, replay_trace
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the Fibery API: fails commands named "fail", answers the rest."""
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = 500 if payload[0]["command"] == "fail" else 200
+        body = json.dumps([{"success": status == 200, "result": []}]).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestTrafficRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.directory.name, "trace.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @patch('requests.post')
+    def test_send_data_is_recorded(self, mock_post):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = b'{"ok": true}'
+        mock_post.return_value = mock_response
+
+        recorder = TrafficRecorder(self.trace_path)
+        agent = FiberyAgent('https://api.fibery.io', 'your_token', recorder=recorder)
+        agent.get_schema()
+
+        mock_post.side_effect = requests.ConnectionError("down")
+        with self.assertRaises(FiberyError):
+            agent.get_schema()
+        recorder.close()
+
+        records = load_trace(self.trace_path)
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["payload"], [{"command": "fibery.schema/query"}])
+        self.assertEqual(records[0]["status"], 200)
+        self.assertEqual(records[0]["response_bytes"], len(mock_response.content))
+        self.assertIsNone(records[0]["error"])
+        self.assertEqual(records[1]["error"], "ConnectionError")
+
+    def test_replay_against_stand_in(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            recorder = TrafficRecorder(self.trace_path)
+            for command in ["fibery.schema/query"] * 8 + ["fail"] * 2:
+                recorder.record([{"command": command}], 0.0, 0.01, 200, 10)
+            recorder.close()
+
+            url = f"http://127.0.0.1:{server.server_address[1]}/api/commands"
+            report = replay_trace(self.trace_path, url, "token", rate=200, concurrency=4)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(report["requests"], 10)
+        self.assertEqual(report["errors"], 2)
+        self.assertEqual(report["error_breakdown"], {"HTTP 500": 2})
+        self.assertGreater(report["throughput_rps"], 0)
+        latency = report["latency_ms"]
+        self.assertLessEqual(latency["p50"], latency["p95"])
+        self.assertLessEqual(latency["p95"], latency["p99"])
+        # Ten requests at 200 req/s cannot finish faster than the schedule allows
+        self.assertGreaterEqual(report["seconds"], 9 / 200)
+
+
+    @patch('requests.Session.post', side_effect=ValueError("Mocked ValueError"))
+    def test_replay_counts_exceptions(self, mock_post):
+        recorder = TrafficRecorder(self.trace_path)
+        for _ in range(3):
+            recorder.record([{"command": "fibery.schema/query"}], 0.0, 0.01, 200, 10)
+        recorder.close()
+
+        report = replay_trace(self.trace_path, "http://127.0.0.1:9/api/commands", "token", concurrency=2)
+
+        self.assertEqual(report["errors"], 3)
+        self.assertEqual(report["error_breakdown"], {"ValueError": 3})
+
+if __name__ == '__main__':
+    unittest.main()
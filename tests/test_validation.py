@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from main import FiberyAgent, FiberyError
+from validation import validate_rows
+
+FIELDS = {
+    'NameSurname': 'text',
+    'Age': 'int',
+    'Salary': 'decimal',
+    'JoinDate': 'date-time',
+    'IsActive': 'bool',
+}
+
+
+class TestValidateRows(unittest.TestCase):
+    def test_coerces_safe_values(self):
+        result = validate_rows([{
+            'NameSurname': 'Stiven Fox',
+            'Age': '25',
+            'Salary': '1000.10',
+            'JoinDate': '2023-01-01T02:00:00+02:00',
+            'IsActive': 'yes',
+        }], FIELDS)
+
+        self.assertTrue(result.is_valid)
+        self.assertEqual(result.valid_rows, [{
+            'NameSurname': 'Stiven Fox',
+            'Age': 25,
+            'Salary': 1000.1,
+            'JoinDate': '2023-01-01T00:00:00.000Z',
+            'IsActive': True,
+        }])
+        self.assertIs(type(result.valid_rows[0]['Age']), int)
+
+    def test_splits_invalid_rows_with_reasons(self):
+        result = validate_rows([
+            {'NameSurname': 'Valid', 'Age': 30},
+            {'NameSurname': 'Bad Age', 'Age': 'thirty'},
+            {'NameSurname': 'Bad Date', 'JoinDate': '2023-13-45'},
+            {'NameSurname': 'Unknown', 'Department': 'A'},
+            {'NameSurname': 'Fraction', 'Age': 30.5, 'IsActive': 'maybe'},
+        ], FIELDS)
+
+        self.assertEqual([row['NameSurname'] for row in result.valid_rows], ['Valid'])
+        reasons = {invalid['index']: invalid['errors'] for invalid in result.invalid_rows}
+        self.assertEqual(sorted(reasons), [1, 2, 3, 4])
+        self.assertIn("Field 'Age' expects int", reasons[1][0])
+        self.assertIn("Field 'JoinDate' expects date-time", reasons[2][0])
+        self.assertEqual(reasons[3], ["Unknown field 'Department'"])
+        self.assertEqual(len(reasons[4]), 2)
+
+    def test_date_times_do_not_depend_on_other_rows(self):
+        rows = [
+            {'NameSurname': 'Offset', 'JoinDate': '2023-01-01T00:00:00+02:00'},
+            {'NameSurname': 'Naive', 'JoinDate': '2023-06-01T00:00:00'},
+        ]
+
+        for ordered in (rows, rows[::-1]):
+            result = validate_rows(ordered, FIELDS)
+            dates = {row['NameSurname']: row['JoinDate'] for row in result.valid_rows}
+            self.assertEqual(dates, {'Offset': '2022-12-31T22:00:00.000Z', 'Naive': '2023-06-01T00:00:00.000Z'})
+
+    def test_null_values_are_kept(self):
+        result = validate_rows([{'NameSurname': 'A', 'Age': None}], FIELDS)
+        self.assertEqual(result.valid_rows, [{'NameSurname': 'A', 'Age': None}])
+
+
+class TestFiberyAgentValidation(unittest.TestCase):
+    def setUp(self):
+        self.agent = FiberyAgent('https://api.fibery.io', 'your_token')
+
+    @patch.object(FiberyAgent, 'get_fields', return_value=FIELDS)
+    @patch('requests.post')
+    def test_add_entity_sends_only_valid_rows(self, mock_post, mock_get_fields):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"success": True}]
+        mock_post.return_value = mock_response
+
+        self.agent.add_entity('Test App', 'Test Database', [
+            {'NameSurname': 'Test Entity', 'Age': '30'},
+            {'NameSurname': 'Broken', 'Age': 'n/a'},
+        ], validate=True)
+        self.agent.add_entity('Test App', 'Test Database', [{'NameSurname': 'Other', 'Age': 1}], validate=True)
+
+        commands = mock_post.call_args_list[0].kwargs["json"]
+        self.assertEqual(len(commands), 1)
+        self.assertEqual(commands[0]["args"]["entity"]["Test Database/Age"], 30)
+        mock_get_fields.assert_called_once()
+
+    @patch.object(FiberyAgent, 'get_fields', return_value=FIELDS)
+    @patch('requests.post')
+    def test_add_entity_fails_fast_without_valid_rows(self, mock_post, mock_get_fields):
+        with self.assertRaises(FiberyError):
+            self.agent.add_entity('Test App', 'Test Database', [{'NameSurname': 'Broken', 'Age': 'n/a'}],
+                                  validate=True)
+        mock_post.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
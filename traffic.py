@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import numpy as np
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from logger_custom import LoggerCustom
+
+
+class TrafficRecorder:
+    def __init__(self, path: str) -> None:
+        """
+        Initialize a recorder that appends every sent command to a JSONL trace.
+
+        Args:
+            path (str): Path of the trace file; new records are appended.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, payload: Any, started_at: float, seconds: float, status: Optional[int],
+               response_bytes: int, error: Optional[str] = None) -> None:
+        """
+        Append one request to the trace.
+
+        Args:
+            payload (Any): The command payload sent to Fibery.
+            started_at (float): Unix time the request was sent.
+            seconds (float): Duration of the request.
+            status (Optional[int]): HTTP status code, None if no response was received.
+            response_bytes (int): Size of the response body.
+            error (Optional[str]): Error kind if the request failed.
+        """
+        line = json.dumps({
+            "ts": round(started_at, 6),
+            "seconds": round(seconds, 6),
+            "status": status,
+            "response_bytes": response_bytes,
+            "error": error,
+            "payload": payload,
+        }, default=str, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the trace file."""
+        with self._lock:
+            self._file.close()
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """
+    Read a JSONL trace written by TrafficRecorder.
+
+    Args:
+        path (str): Path of the trace file.
+
+    Returns:
+        List[Dict[str, Any]]: The recorded requests in order.
+    """
+    with open(path, "r", encoding="utf-8") as trace_file:
+        return [json.loads(line) for line in trace_file if line.strip()]
+
+
+def replay_trace(path: str, url: str, token: str, rate: Optional[float] = None, concurrency: int = 1,
+                 timeout: float = 30.0) -> Dict[str, Any]:
+    """
+    Re-issue the payloads of a recorded trace against an endpoint and measure the results.
+
+    Args:
+        path (str): Path of the trace file.
+        url (str): Endpoint to send the payloads to, e.g. a local stand-in of the Fibery API.
+        token (str): Token sent in the Authorization header.
+        rate (Optional[float]): Target requests per second, None to send as fast as concurrency allows.
+        concurrency (int): Number of requests in flight at the same time.
+        timeout (float): Timeout of a single request in seconds.
+
+    Returns:
+        Dict[str, Any]: Request and error counts, error breakdown, throughput and latency percentiles in ms.
+    """
+    if concurrency <= 0:
+        raise ValueError("concurrency must be a positive number.")
+    if rate is not None and rate <= 0:
+        raise ValueError("rate must be a positive number.")
+
+    records = load_trace(path)
+    headers = {
+        "Authorization": f"Token {token}",
+        "Content-Type": "application/json",
+    }
+    sessions = threading.local()
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def send(position: int, payload: Any, start: float) -> None:
+        if rate is not None:
+            delay = start + position / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+
+        error = None
+        sent = time.perf_counter()
+        try:
+            response = sessions.session.post(url, headers=headers, json=payload, timeout=timeout)
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            error = type(e).__name__
+        elapsed = time.perf_counter() - sent
+
+        with lock:
+            latencies.append(elapsed)
+            if error is not None:
+                errors[error] = errors.get(error, 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(send, position, record["payload"], start)
+            for position, record in enumerate(records)
+        ]
+    duration = time.perf_counter() - start
+
+    # A request that failed outside the HTTP call still counts, under the name of its exception
+    for future in futures:
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Replayed request failed: {error!r}")
+            errors[type(error).__name__] = errors.get(type(error).__name__, 0) + 1
+
+    latencies_ms = np.array(latencies) * 1000
+    report = {
+        "requests": len(records),
+        "errors": sum(errors.values()),
+        "error_breakdown": errors,
+        "seconds": round(duration, 3),
+        "throughput_rps": round(len(records) / duration, 2) if duration > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(float(latencies_ms.mean()), 2) if len(latencies_ms) else 0.0,
+            "p50": round(float(np.percentile(latencies_ms, 50)), 2) if len(latencies_ms) else 0.0,
+            "p95": round(float(np.percentile(latencies_ms, 95)), 2) if len(latencies_ms) else 0.0,
+            "p99": round(float(np.percentile(latencies_ms, 99)), 2) if len(latencies_ms) else 0.0,
+        },
+    }
+    logger.info(f"Replayed {report['requests']} requests in {report['seconds']}s: "
+                f"{report['throughput_rps']} req/s, {report['errors']} errors, latency {report['latency_ms']}")
+    return report
+
+
+if __name__ == "__main__":
+    # Imported by main, the logger is configured there; run as a script it is configured here
+    logger = LoggerCustom('log/main.log', "INFO").get_logger()
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Replay a recorded Fibery traffic trace against an endpoint.")
+    parser.add_argument("trace", help="Path of the JSONL trace written by TrafficRecorder")
+    parser.add_argument("--url", default=os.getenv('API_FIBERY_URL'), help="Endpoint, API_FIBERY_URL by default")
+    parser.add_argument("--token", default=os.getenv('API_FIBERY_TOKEN', ''), help="Token, API_FIBERY_TOKEN by default")
+    parser.add_argument("--rate", type=float, default=None, help="Target requests per second")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight at the same time")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout of a single request in seconds")
+    args = parser.parse_args()
+
+    if not args.url:
+        logger.error("An endpoint is required: pass --url or set API_FIBERY_URL.")
+        sys.exit(1)
+
+    result = replay_trace(args.trace, args.url, args.token, rate=args.rate,
+                          concurrency=args.concurrency, timeout=args.timeout)
+    print(json.dumps(result, indent=2))
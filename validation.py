@@ -0,0 +1,168 @@
+import uuid
+from datetime import date
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from constants import SUPPORTED_FIELD_TYPES
+
+BOOL_VALUES = {
+    'true': True, '1': True, '1.0': True, 'yes': True, 'y': True,
+    'false': False, '0': False, '0.0': False, 'no': False, 'n': False,
+}
+
+
+@dataclass
+class ValidationResult:
+    """Rows split by validation: coerced valid rows and invalid rows with their reasons."""
+    valid_rows: List[Dict[str, Any]] = field(default_factory=list)
+    invalid_rows: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.invalid_rows
+
+
+def normalize_field_type(field_type: str) -> str:
+    """
+    Map a field type to the short Fibery type name returned by get_fields.
+
+    Args:
+        field_type (str): A key of SUPPORTED_FIELD_TYPES ("float") or a Fibery type ("decimal", "fibery/decimal").
+
+    Returns:
+        str: The short Fibery type name, e.g. "decimal".
+    """
+    return SUPPORTED_FIELD_TYPES.get(field_type, field_type).split('/')[-1]
+
+
+def _is_kind(column: pd.Series, kinds: Tuple[type, ...]) -> np.ndarray:
+    """Return a mask of the values that are instances of the given types."""
+    return np.fromiter((isinstance(value, kinds) for value in column), dtype=bool, count=len(column))
+
+
+def _as_objects(values: pd.Series, convert: Any) -> pd.Series:
+    """Convert a column to plain Python values, so rows stay JSON serializable."""
+    return pd.Series([None if pd.isna(value) else convert(value) for value in values.tolist()],
+                     index=values.index, dtype=object)
+
+
+def _coerce_int(column: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    numbers = pd.to_numeric(column, errors='coerce')
+    # Bools are numbers for pandas, but never a meaningful int value
+    bad = numbers.isna().to_numpy() | _is_kind(column, (bool, np.bool_))
+    bad |= ~bad & (np.mod(numbers.fillna(0).to_numpy(dtype=float), 1) != 0)
+    return _as_objects(numbers, int), bad
+
+
+def _coerce_decimal(column: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    numbers = pd.to_numeric(column, errors='coerce')
+    bad = numbers.isna().to_numpy() | _is_kind(column, (bool, np.bool_))
+    bad |= ~bad & np.isinf(numbers.fillna(0).to_numpy(dtype=float))
+    return _as_objects(numbers, float), bad
+
+
+def _coerce_bool(column: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    flags = column.astype(str).str.strip().str.lower().map(BOOL_VALUES)
+    return _as_objects(flags, bool), flags.isna().to_numpy()
+
+
+def _coerce_date_time(column: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    # Plain numbers would be read as epoch nanoseconds, which is never what a caller means
+    allowed = _is_kind(column, (str, date, np.datetime64))
+
+    # Each value is parsed on its own: parsed as a column, naive values take the offset of other rows
+    def parse(value: Any) -> Optional[str]:
+        timestamp = pd.to_datetime(value, utc=True, errors='coerce', format='ISO8601')
+        if pd.isna(timestamp):
+            return None
+        return timestamp.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+    text = column.where(allowed).map(parse)
+    return text, text.isna().to_numpy()
+
+
+def _coerce_text(column: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    allowed = _is_kind(column, (str, int, float, np.number)) & ~_is_kind(column, (bool, np.bool_))
+    return column.map(str), ~allowed
+
+
+def _coerce_uuid(column: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    def parse(value: Any) -> Any:
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            return None
+
+    parsed = column.map(parse)
+    return parsed, parsed.isna().to_numpy()
+
+
+COERCERS = {
+    'int': _coerce_int,
+    'decimal': _coerce_decimal,
+    'bool': _coerce_bool,
+    'date-time': _coerce_date_time,
+    'text': _coerce_text,
+    'uuid': _coerce_uuid,
+}
+
+
+def validate_rows(list_data: List[Dict[str, Any]], fields: Dict[str, str]) -> ValidationResult:
+    """
+    Validate entity rows column-wise against field types and coerce values where it is safe.
+
+    Numbers given as strings, ISO date-times in any offset, decimals and bools written as
+    "yes"/"1"/"true" are coerced; null values are kept as None.
+
+    Args:
+        list_data (List[Dict[str, Any]]): Entity rows keyed by field name.
+        fields (Dict[str, str]): Field names mapped to their types, as returned by get_fields.
+
+    Returns:
+        ValidationResult: Coerced valid rows, and invalid rows as {"index", "row", "errors"} dicts.
+    """
+    if not list_data:
+        return ValidationResult()
+
+    df_data = pd.DataFrame(list_data, dtype=object)
+    present = df_data.notna().to_numpy()
+    errors: List[List[str]] = [[] for _ in range(len(df_data))]
+    coerced: Dict[str, pd.Series] = {}
+
+    for column_position, column_name in enumerate(df_data.columns):
+        mask = present[:, column_position]
+        if not mask.any():
+            continue
+
+        if column_name not in fields:
+            for row_position in np.flatnonzero(mask):
+                errors[row_position].append(f"Unknown field '{column_name}'")
+            continue
+
+        field_type = normalize_field_type(fields[column_name])
+        coercer = COERCERS.get(field_type)
+        if coercer is None:
+            # Relations and other types are sent as they are
+            coerced[column_name] = df_data[column_name]
+            continue
+
+        values, bad = coercer(df_data[column_name])
+        coerced[column_name] = values
+        for row_position in np.flatnonzero(bad & mask):
+            errors[row_position].append(
+                f"Field '{column_name}' expects {field_type}, got {df_data[column_name].iat[row_position]!r}"
+            )
+
+    result = ValidationResult()
+    for row_position, row in enumerate(list_data):
+        if errors[row_position]:
+            result.invalid_rows.append({"index": row_position, "row": row, "errors": errors[row_position]})
+            continue
+        result.valid_rows.append({
+            name: coerced[name].iat[row_position] if present[row_position, df_data.columns.get_loc(name)] else None
+            for name in row
+        })
+
+    return result